@@ -0,0 +1,184 @@
+#! /usr/bin/python3
+
+# Adaptive sweep of one manipulation variable, driven by parseConfig in parameters.sh for configs with an
+# adapt=<flag> line. Every run of the config measures the values printed by "next", the exported
+# runtime_chrono(s) of every point (protocol, datatype, input and the other loop variables) then narrows
+# the search of that point:
+#   bisect: the value where the runtime crosses the target, like the bandwidth a protocol stops meeting it
+#   golden: the value with the lowest runtime by golden-section search, like the best txbuffer
+
+import argparse
+import json
+import math
+import os
+import sys
+
+# the parser defines the loop variables and reads the results table
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+from sevare_parser import load_table, switches_names, variable_array
+
+# config flags -> table column of the variable
+flag_columns = {"input": "input_size", "threads": "threads", "txbuffer": "txbuffer", "rxbuffer": "rxbuffer",
+                "cpu": "cpus", "cpuquota": "quotas(%)", "freq": "freqs(GHz)", "latency": "latencies(ms)",
+                "bandwidth": "bandwidths(Mbs)", "packetdrop": "packetdrops(%)"}
+
+metric = "runtime_chrono(s)"
+ratio = (math.sqrt(5) - 1) / 2
+
+
+def format_value(state, value):
+    return str(int(round(value))) if state["integer"] else "{:g}".format(value)
+
+
+def read_state(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(path, state):
+    with open(path, "w") as f:
+        json.dump(state, f, indent=1)
+
+
+def ingest(state, table):
+    """
+    Adds the runtimes of a results table to the measured points, repetitions are averaged
+    """
+    header, columns, nrows, _ = load_table(table)
+    if state["column"] not in columns or metric not in columns:
+        print("Skip " + table + " - lacks " + state["column"] + " or " + metric, file=sys.stderr)
+        return
+    key_columns = [name for name in ["protocol"] + switches_names + variable_array
+                   if name in columns and name != state["column"]]
+    for r in range(nrows):
+        try:
+            runtime = float(columns[metric][r])
+        except ValueError:
+            continue
+        key = ";".join(name + "=" + columns[name][r] for name in key_columns)
+        value = format_value(state, float(columns[state["column"]][r]))
+        total, n = state["points"].setdefault(key, {}).get(value, [0.0, 0])
+        state["points"][key][value] = [total + runtime, n + 1]
+
+
+def get_means(state, key):
+    return {float(value): total / n for value, (total, n) in state["points"][key].items()}
+
+
+def next_bisect(state, key):
+    """
+    :return: values to measure for the point, empty when the crossing is narrower than the tolerance
+    """
+    means = get_means(state, key)
+    missing = [value for value in (state["low"], state["high"]) if value not in means]
+    if missing:
+        return missing
+    points = sorted(means.items())
+    for (v1, r1), (v2, r2) in zip(points, points[1:]):
+        if (r1 - state["target"]) * (r2 - state["target"]) > 0:
+            continue
+        middle = float(format_value(state, (v1 + v2) / 2))
+        if v2 - v1 <= state["tolerance"] or not v1 < middle < v2:
+            return []
+        return [middle]
+    # the target is met or missed on the whole range
+    return []
+
+
+def next_golden(state, key):
+    """
+    :return: values to measure for the point, empty when the bracket of the minimum is narrower than the tolerance
+    """
+    means = get_means(state, key)
+    a, b = state["brackets"].setdefault(key, [state["low"], state["high"]])
+    while b - a > state["tolerance"]:
+        c = float(format_value(state, b - ratio * (b - a)))
+        d = float(format_value(state, a + ratio * (b - a)))
+        if not c < d:
+            break
+        missing = [value for value in (c, d) if value not in means]
+        if missing:
+            return missing
+        # the minimum of a unimodal runtime lies in the bracket of the lower interior point
+        a, b = (a, d) if means[c] < means[d] else (c, b)
+        state["brackets"][key] = [a, b]
+    return []
+
+
+def get_next(state):
+    if not state["points"]:
+        # first run, before any point is known
+        return [state["low"], state["high"]] if state["method"] == "bisect" else \
+            [state["high"] - ratio * (state["high"] - state["low"]), state["low"] + ratio * (state["high"] - state["low"])]
+    values = set()
+    for key in state["points"]:
+        values.update(next_bisect(state, key) if state["method"] == "bisect" else next_golden(state, key))
+    return sorted(values)
+
+
+def report(state):
+    lines = []
+    for key in sorted(state["points"]):
+        means = sorted(get_means(state, key).items())
+        if state["method"] == "golden":
+            value, runtime = min(means, key=lambda point: point[1])
+            a, b = state["brackets"].get(key, [state["low"], state["high"]])
+            lines.append(key + ": lowest runtime " + "{:g}".format(runtime) + "s at " + state["flag"] + " " +
+                         format_value(state, value) + ", minimum in [" + format_value(state, a) + ", " +
+                         format_value(state, b) + "]")
+            continue
+        crossing = [(p1, p2) for p1, p2 in zip(means, means[1:])
+                    if (p1[1] - state["target"]) * (p2[1] - state["target"]) <= 0]
+        if crossing:
+            (v1, r1), (v2, r2) = crossing[0]
+            lines.append(key + ": " + str(state["target"]) + "s crossed between " + state["flag"] + " " +
+                         format_value(state, v1) + " (" + "{:g}".format(r1) + "s) and " + format_value(state, v2) +
+                         " (" + "{:g}".format(r2) + "s)")
+        else:
+            met = all(runtime <= state["target"] for _, runtime in means)
+            lines.append(key + ": " + str(state["target"]) + "s " + ("met" if met else "missed") +
+                         " on the whole range")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Adaptive sweep of one manipulation variable over several runs of a config.')
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = commands.add_parser("init", help="start a new sweep")
+    init_parser.add_argument('state', type=str, help='Required, path of the sweep state file.')
+    init_parser.add_argument('flag', type=str, choices=list(flag_columns), help='Required, config flag to sweep.')
+    init_parser.add_argument('range', type=str, help='Required, <low>,<high> values of the flag.')
+    init_parser.add_argument('tolerance', type=float, help='Required, width of the final interval.')
+    init_parser.add_argument('-t', '--target', type=float, help='(bisect) runtime_chrono(s) target in seconds')
+    init_parser.add_argument('-m', '--method', type=str, default="bisect", choices=["bisect", "golden"],
+                             help='(Optional) bisect for the target crossing, golden for the lowest runtime')
+
+    next_parser = commands.add_parser("next", help="print the comma separated values of the next run")
+    next_parser.add_argument('state', type=str, help='Required, path of the sweep state file.')
+    next_parser.add_argument('table', type=str, nargs="?", help='(Optional) results table of the last run')
+
+    report_parser = commands.add_parser("report", help="print the result of every point")
+    report_parser.add_argument('state', type=str, help='Required, path of the sweep state file.')
+
+    args = parser.parse_args()
+
+    if args.command == "init":
+        low, high = sorted(float(value) for value in args.range.split(","))
+        if args.method == "bisect" and args.target is None:
+            print("bisect requires a runtime target", file=sys.stderr)
+            sys.exit(1)
+        integer = low.is_integer() and high.is_integer() and args.tolerance.is_integer()
+        write_state(args.state, {"flag": args.flag, "column": flag_columns[args.flag], "low": low, "high": high,
+                                 "tolerance": args.tolerance, "target": args.target, "method": args.method,
+                                 "integer": integer, "points": {}, "brackets": {}})
+    elif args.command == "next":
+        state = read_state(args.state)
+        if args.table:
+            ingest(state, args.table)
+        values = get_next(state)
+        write_state(args.state, state)
+        print(",".join(format_value(state, value) for value in values))
+    else:
+        print("\n".join(report(read_state(args.state))))
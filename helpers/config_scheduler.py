@@ -0,0 +1,194 @@
+#! /usr/bin/python3
+
+# Concurrent config runs on disjoint node groups, called by setParameters in parameters.sh with --schedule.
+# The pool of nodes is split into groups of the same hardware, every group runs one config file of the
+# queue at a time with "sevarebench.sh --config", with its own internal network and export path.
+# Failed config runs are queued again on the next free group, the other groups keep running.
+
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+# the tools define the hardware of the testbed nodes
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+from sevare_hardware import nodehardware
+
+# seconds between the checks of the running groups
+poll_interval = 10
+
+
+def get_hardware(node):
+    return nodehardware.get(node, "unknown")
+
+
+def read_config(path):
+    """
+    Reads the config like parseConfig in parameters.sh
+    :return: dict flag -> parameter
+    """
+    config = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or "#" in line[:4]:
+                continue
+            flag, _, parameter = line.split(" ")[0].partition("=")
+            config[flag] = parameter
+    return config
+
+
+def expand(values):
+    """
+    :return: the values of a config parameter, with the ... range syntax of setArray expanded
+    """
+    values = values.split(",")
+    if "..." not in values:
+        return values
+    i = values.index("...")
+    try:
+        start, step, stop = float(values[i - 2]), float(values[i - 1]) - float(values[i - 2]), float(values[i + 1])
+        count = int(round((stop - start) / step))
+    except (IndexError, ValueError, ZeroDivisionError):
+        return values
+    return values[:i - 2] + ["{:g}".format(start + k * step) for k in range(count + 1)] + values[i + 2:]
+
+
+def get_size(config):
+    # split roles 3to4 and 4, and protocols above 6 run on four nodes
+    split = [int(value) for value in expand(config.get("split", "0")) if value.isdigit()]
+    protocols = [int(value) for value in expand(config.get("protocols", "2")) if value.isdigit()]
+    return 4 if any(value >= 2 for value in split) or any(value > 6 for value in protocols) else 3
+
+
+def get_configs(path):
+    # file or folder, like parseConfig
+    if os.path.isfile(path):
+        return [path]
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".conf"))
+    print("no such file or directory: " + path, file=sys.stderr)
+    sys.exit(1)
+
+
+def allocate(queue, free):
+    """
+    Finds the first queued config with a free group of matching hardware
+    :return: queue position and node group, None if no queued config fits
+    """
+    for position, (conf, _) in enumerate(queue):
+        config = read_config(conf)
+        if config.get("nodes"):
+            # configs with their own nodes wait for exactly these
+            group = config["nodes"].split(",")
+            if all(node in free for node in group):
+                return position, group
+            continue
+        size = get_size(config)
+        for hardware in sorted(set(get_hardware(node) for node in free)):
+            group = [node for node in free if get_hardware(node) == hardware][:size]
+            if len(group) == size:
+                return position, group
+    return None
+
+
+def schedule(path, pool, retries, logdir):
+    unknown = [node for node in pool if node not in nodehardware]
+    if unknown:
+        print("[warn] hardware of " + ",".join(unknown) + " unknown, grouped together")
+    queue = [(conf, 0) for conf in get_configs(path)]
+    for conf, _ in queue:
+        config = read_config(conf)
+        if config.get("nodes"):
+            # configs with their own nodes would wait forever for nodes outside of the pool
+            group = config["nodes"].split(",")
+            missing = [node for node in group if node not in pool]
+            if missing:
+                print("[fail] nodes " + ",".join(missing) + " of " + conf + " are not in the pool")
+                sys.exit(1)
+            if len(set(get_hardware(node) for node in group)) > 1:
+                print("[fail] nodes " + config["nodes"] + " of " + conf + " differ in hardware")
+                sys.exit(1)
+        elif not any(
+                sum(get_hardware(other) == get_hardware(node) for other in pool) >= get_size(config) for node in pool):
+            print("[fail] no group of " + str(get_size(config)) + " nodes with matching hardware for " + conf)
+            sys.exit(1)
+    os.makedirs(logdir, exist_ok=True)
+
+    running = {}
+    failed = []
+
+    def stop(signum, _):
+        # the trap of every config run verifies and exports what was measured so far
+        for process, *_ in running.values():
+            os.killpg(process.pid, signal.SIGTERM)
+        for process, *_ in running.values():
+            process.wait()
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while queue or running:
+        free = [node for node in pool if all(node not in group for _, group, *_ in running.values())]
+        allocation = allocate(queue, free)
+        if allocation is not None:
+            position, group = allocation
+            conf, attempt = queue.pop(position)
+            # isolated internal network of the group, 10.10.<network>.0/24
+            network = random.choice([n for n in range(2, 255) if n not in running])
+            log = os.path.join(logdir, "sevarelog_" + os.path.basename(conf)[:-5] + "_" + str(network))
+            print("  starting " + conf + " on " + ",".join(group) + " in network 10.10." + str(network) +
+                  ".0/24, log " + log)
+            with open(log, "a") as f:
+                # own process group, the trap of the config run closes its group only
+                process = subprocess.Popen(["bash", "sevarebench.sh", "--config", conf, ",".join(group), str(network)],
+                                           stdout=f, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                           start_new_session=True)
+            running[network] = (process, group, conf, attempt)
+            # the export paths are named by the start time in seconds
+            time.sleep(1)
+            continue
+
+        time.sleep(poll_interval)
+        for network, (process, group, conf, attempt) in list(running.items()):
+            if process.poll() is None:
+                continue
+            del running[network]
+            if process.returncode == 0:
+                print("[ ok ] " + conf + " done on " + ",".join(group))
+            elif attempt < retries:
+                print("[warn] " + conf + " failed on " + ",".join(group) + " with exit code " +
+                      str(process.returncode) + ", queued again")
+                queue.append((conf, attempt + 1))
+            else:
+                print("[fail] " + conf + " failed on " + ",".join(group) + " with exit code " + str(process.returncode))
+                failed.append(conf)
+
+    if failed:
+        print("[fail] failed configs: " + " ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Runs the config files of a folder concurrently on disjoint node groups of matching hardware.')
+    parser.add_argument('configs', type=str, help='Required, config file or folder of config files.')
+    parser.add_argument('-r', '--retries', type=int, default=1,
+                        help='(Optional) times a failed config run is queued again (default: 1)')
+    parser.add_argument('-l', '--logdir', type=str, default="schedulerlogs",
+                        help='(Optional) folder of the logs of the config runs (default: schedulerlogs)')
+
+    args = parser.parse_args()
+
+    # the node pool is read from stdin, node names in the command line would count as node usage in
+    # the check of setParameters
+    pool = sys.stdin.read().strip().replace(",", " ").split()
+    if not pool:
+        print("no nodes given", file=sys.stderr)
+        sys.exit(1)
+
+    schedule(args.configs, pool, args.retries, args.logdir)
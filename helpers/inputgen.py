@@ -1,85 +1,279 @@
 #! /usr/bin/python3
 
-from random import randint, seed, random
+import argparse
+import filecmp
+import hashlib
+import mmap
+import multiprocessing
+import os
 import sys
 
+import numpy as np
+
 rrange = 1
 float_precision = 6
+mode = "d"
+# register width in bits of the MP-Slice datatype for the packed mode, 256 -> AVX
+dtype = 64
+# numbers generated and written at once, keeps memory bounded independent of <amount>
+chunk_size = 1 << 20
+# share of the range from which unique sets are drawn by a range permutation
+set_density = 0.5
+# bump whenever the output for the same arguments changes, invalidates cached inputs
+cache_version = 1
 
-def get_random_set(n: int):
-        if rrange < n:
-                print("range >= amount must be true for unique sets")
-                print("(range)", rrange,"<", n,"(amount), please change to reasonable constellation")
-                exit(1)
-        rand_set = set()
-        while len(rand_set) < n:
-                rand_set.add(randint(1, rrange))
-        return rand_set
+def get_set_dtype():
+        # compact storage, 4 bytes per value whenever the range allows it
+        return np.uint32 if rrange < 2**32 else np.uint64
+
+def sample_range_permutation(rng, n: int):
+        # dense sets: shuffle the whole range once and take the first <amount>,
+        # O(<range>) which is O(<amount>) above set_density
+        values = np.arange(1, rrange + 1, dtype=get_set_dtype())
+        rng.shuffle(values)
+        return values[:n]
+
+def sample_rejection(rng, n: int):
+        # sparse sets: draw batches with replacement until enough distinct values
+        # are collected, then drop the surplus at random. The procedure is symmetric
+        # in all values of the range, so every subset is equally likely
+        values = np.empty(0, dtype=get_set_dtype())
+        while len(values) < n:
+                unseen = rrange - len(values)
+                # expected draws to hit the missing values, few rounds below set_density
+                size = int(-unseen * np.log1p(-(n - len(values)) / unseen) * 1.01) + 64
+                draws = rng.integers(1, rrange, size=size, endpoint=True, dtype=values.dtype)
+                values = np.concatenate((values, draws))
+                values.sort()
+                values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+        surplus = rng.choice(len(values), size=len(values) - n, replace=False)
+        return np.delete(values, surplus)
+
+def get_random_set(rng, n: int, ordered=False):
+        if n >= rrange * set_density:
+                rand_set = sample_range_permutation(rng, n)
+                if ordered:
+                        rand_set.sort()
+        else:
+                # comes in ascending order
+                rand_set = sample_rejection(rng, n)
+                if not ordered:
+                        rng.shuffle(rand_set)
+        for start in range(0, n, chunk_size):
+                yield rand_set[start:start + chunk_size]
+
+def get_random_tupel(rng, n: int):
+        for start in range(0, n, chunk_size):
+                yield rng.integers(1, rrange, size=min(chunk_size, n - start), endpoint=True, dtype=np.int64)
 
-def get_random_tupel(n: int):
-        return [randint(1, rrange) for i in range(n)]
+def get_random_matrix(rng, n: int):
+        return get_random_tupel(rng, n * n)
 
-def get_random_matrix(n: int):
-        return [get_random_tupel(n) for i in range(n)]
-        
-def get_random_float_tupel(n: int):
-        return [randint(1, n) + round(random(), float_precision) for i in range(n)]
+def get_random_float_tupel(rng, n: int, high=None):
+        # integer part in [1:high], high defaults to the amount like the row length of a matrix
+        high = high or n
+        for start in range(0, n, chunk_size):
+                size = min(chunk_size, n - start)
+                ints = rng.integers(1, high, size=size, endpoint=True, dtype=np.int64)
+                yield ints + np.round(rng.random(size), float_precision)
 
-def get_random_float_matrix(n: int):
-        return [get_random_float_tupel(n) for i in range(n)]
+def get_random_float_matrix(rng, n: int):
+        return get_random_float_tupel(rng, n * n, n)
 
-def set_to_string(s: set):
+def chunk_to_sliced(chunk):
+        # bit-sliced layout of <dtype> values per register: word j holds bit 63-j of
+        # every value, value k at bit k of the word (little endian), last batch 0-padded
+        padded = np.zeros(-(-len(chunk) // dtype) * dtype, dtype=np.uint64)
+        padded[:len(chunk)] = chunk
+        registers = padded.reshape(-1, dtype)
+        sliced = np.empty((len(registers), 64, dtype // 8), dtype=np.uint8)
+        # one vectorized pass per bit plane beats unpacking all bits and transposing them
+        for j in range(64):
+                plane = (registers >> np.uint64(63 - j)) & np.uint64(1)
+                sliced[:, j, :] = np.packbits(plane.astype(np.bool_), axis=-1, bitorder='little')
+        return sliced.tobytes()
+
+def chunk_to_bytes(chunk):
+        if (mode == 'p'):
+                return chunk_to_sliced(chunk)
         if (mode == 'b'):
-                # return all numbers as binary, 0-padded to 64 bits
-                return ' '.join(''.join(f'{num:064b}' for num in s))
-        return ' '.join(map(str, s))
-
-def matrix_to_string(m):
-        return ' '.join(set_to_string(row) for row in m)
-
-try:
-        option = sys.argv[1][-1]
-        n = int(sys.argv[2])
-        rrange = int(sys.argv[3])
-        seed(int(sys.argv[4]))
+                # all numbers as binary, 0-padded to 64 bits, every bit separated by a blank
+                bits = np.unpackbits(chunk.astype('>u8').view(np.uint8)) + ord('0')
+                out = np.full(2 * len(bits) - 1, ord(' '), dtype=np.uint8)
+                out[0::2] = bits
+                return out.tobytes()
+        return ' '.join(map(str, chunk.tolist())).encode()
+
+def write_chunks(chunks, out):
+        # raw packed output has no separators
+        blank = b'' if mode == 'p' else b' '
+        separator = b''
+        for chunk in chunks:
+                if len(chunk) == 0:
+                        continue
+                out.write(separator)
+                out.write(chunk_to_bytes(chunk))
+                separator = blank
+        if mode != 'p':
+                out.write(b'\n')
+
+def get_generator(seed: int, shard=0):
+        # counter-based Philox, every shard starts 2^128 draws after the previous one,
+        # so a shard does not depend on which other shards are generated with it
+        return np.random.Generator(np.random.Philox(seed).jumped(shard))
+
+def get_chunks(rng, option, n: int, ordered=False):
+        # python3.9 and lower support
+        if (option == 't'):
+                return get_random_tupel(rng, n)
+        elif (option == 'f'):
+                return get_random_float_tupel(rng, n)
+        elif (option == 'm'):
+                return get_random_matrix(rng, n)
+        elif (option == 'k'):
+                return get_random_float_matrix(rng, n)
+        return get_random_set(rng, n, ordered)
+
+def get_cache_path(cache_dir, *key):
+        digest = hashlib.sha256(repr((cache_version,) + key).encode()).hexdigest()
+        return os.path.join(cache_dir, digest)
+
+def fill_cache(cached, chunks):
+        # write next to the entry and rename, concurrent shard workers never see partial files
+        tmp = cached + "." + str(os.getpid()) + ".tmp"
+        with open(tmp, "wb") as out:
+                write_chunks(chunks, out)
+        if os.path.exists(cached) and not filecmp.cmp(tmp, cached, shallow=False):
+                print("inputgen cache entry", cached, "did not match, replaced", file=sys.stderr)
+        os.replace(tmp, cached)
+
+def evict_cache(cache_dir, limit: int):
+        # least recently used first, cache hits refresh the modification time
+        entries = []
+        for entry in os.scandir(cache_dir):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+                if total <= limit:
+                        break
+                try:
+                        os.remove(path)
+                except FileNotFoundError:
+                        pass
+                total -= size
+
+def write_cached(cached, out):
+        # empty inputs, like packed ones of amount 0, cannot be mapped
+        if os.path.getsize(cached) == 0:
+                return
+        with open(cached, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                out.write(data)
+
+def write_input(option, n: int, seed: int, shard: int, path, ordered=False, cache=None):
+        out = open(path, "wb") if path else sys.stdout.buffer
         try:
-                mode = sys.argv[5][-1]
-        
-        except:
-                mode = "d"
-
-
-except:
-        print("Usage: ./inputgen.py <option> <amount> <range> <seed>")
-        print("Options:")
-        print("  -s: set,   Print <amount> many unique random numbers in range [1:<range>]")
-        print("  -t: tupel, Print <amount> many random numbers in range [1:<range>]")
-        print("  -f: float, Print <amount> many random numbers in range [1:<range>]")
-        print("  -m: matrix, Print <amount>^2 many random numbers in range [1:<range>]")
-        print("  -k: floatmatrix, Print <amount>^2 many random numbers in range [1:<range>]")
-        print("Modes:")
-        print("  -d: decimal base10, print numbers in decimal (default)")
-        print("  -b: binary, print numbers in binary representation")
-
-        exit()
-
-# python3.9 and lower support
-if (option == 't'):
-        print(set_to_string(get_random_tupel(n)))
-elif (option == 'f'):
-        print(set_to_string(get_random_float_tupel(n)))
-elif (option == 'm'):
-        print(matrix_to_string(get_random_matrix(n)))
-elif (option == 'k'):
-        print(matrix_to_string(get_random_float_matrix(n)))
-else:
-        print(set_to_string(get_random_set(n)))
-
-#for future python3.10 and higher releases
-#match option:
-#        case 't':
-#                print(set_to_string(get_random_tupel(n)))
-#        case 'f':
-#                print(set_to_string(get_random_float_tupel(n)))
-#        case _:
-#                print(set_to_string(get_random_set(n)))
\ No newline at end of file
+                if cache is None:
+                        write_chunks(get_chunks(get_generator(seed, shard), option, n, ordered), out)
+                        return
+                cache_dir, cache_size, verify = cache
+                cached = get_cache_path(cache_dir, option, n, rrange, seed, mode, dtype, shard, ordered)
+                if verify or not os.path.exists(cached):
+                        fill_cache(cached, get_chunks(get_generator(seed, shard), option, n, ordered))
+                while True:
+                        try:
+                                os.utime(cached)
+                                write_cached(cached, out)
+                                break
+                        except FileNotFoundError:
+                                # evicted by another shard worker in between, generated again
+                                fill_cache(cached, get_chunks(get_generator(seed, shard), option, n, ordered))
+                evict_cache(cache_dir, cache_size * 1024 * 1024)
+        finally:
+                if path:
+                        out.close()
+
+def write_shard(task):
+        # pool worker, the module state is handed over for spawned processes
+        global rrange, mode, dtype
+        rrange, mode, dtype, *task = task
+        write_input(*task)
+
+if __name__ == "__main__":
+        parser = argparse.ArgumentParser(
+                usage="./inputgen.py <option> <amount> <range> <seed> [<mode>] [-o <file>] [--sorted] [--shards <N>]",
+                description="Print random inputs for the MP-Slice programs, reproducible for a given <seed>.")
+        options = parser.add_mutually_exclusive_group()
+        options.add_argument('-s', dest='option', action='store_const', const='s',
+                help='set,   Print <amount> many unique random numbers in range [1:<range>] (default)')
+        options.add_argument('-t', dest='option', action='store_const', const='t',
+                help='tupel, Print <amount> many random numbers in range [1:<range>]')
+        options.add_argument('-f', dest='option', action='store_const', const='f',
+                help='float, Print <amount> many random numbers in range [1:<range>]')
+        options.add_argument('-m', dest='option', action='store_const', const='m',
+                help='matrix, Print <amount>^2 many random numbers in range [1:<range>]')
+        options.add_argument('-k', dest='option', action='store_const', const='k',
+                help='floatmatrix, Print <amount>^2 many random numbers in range [1:<range>]')
+        modes = parser.add_mutually_exclusive_group()
+        modes.add_argument('-d', dest='mode', action='store_const', const='d',
+                help='decimal base10, print numbers in decimal (default)')
+        modes.add_argument('-b', dest='mode', action='store_const', const='b',
+                help='binary, print numbers in binary representation')
+        modes.add_argument('-p', dest='mode', action='store_const', const='p',
+                help='packed, write raw bytes, bit-sliced for the datatype width given by --dtype')
+        parser.add_argument('--dtype', type=int, default=64, choices=[8, 16, 32, 64, 128, 256, 512],
+                help='(Optional) datatype width in bits for the packed mode, 128 -> SSE, 256 -> AVX, 512 -> AVX512 (default: 64)')
+        parser.add_argument('amount', type=int)
+        parser.add_argument('range', type=int)
+        parser.add_argument('seed', type=int)
+        parser.add_argument('-o', '--output', type=str, help='(Optional) write to <file> instead of stdout')
+        parser.add_argument('--sorted', action='store_true', help='(Optional) print unique sets in ascending order')
+        parser.add_argument('--shards', type=int,
+                help='(Optional) write <N> independent inputs in parallel, one per player/thread, to <file>.<i>')
+        parser.add_argument('--shard', type=int, default=0,
+                help='(Optional) print only input <i> of a sharded run, identical to its shard file')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                help='(Optional) number of processes writing shards (default: all cores)')
+        parser.add_argument('--cache-dir', type=str,
+                default=os.path.join(os.path.expanduser("~"), ".cache", "sevarebench", "inputgen"),
+                help='(Optional) directory of cached inputs, keyed by all arguments (default: ~/.cache/sevarebench/inputgen)')
+        parser.add_argument('--cache-size', type=int, default=4096,
+                help='(Optional) cache size limit in MiB, least recently used inputs are evicted (default: 4096)')
+        cachemodes = parser.add_mutually_exclusive_group()
+        cachemodes.add_argument('--no-cache', action='store_true', help='(Optional) bypass the cache')
+        cachemodes.add_argument('--verify-cache', action='store_true',
+                help='(Optional) regenerate the input and replace the cached one if it differs')
+        parser.set_defaults(option='s', mode='d')
+
+        args = parser.parse_args()
+
+        n = args.amount
+        rrange = args.range
+        mode = args.mode
+        dtype = args.dtype
+
+        if (mode in ['b', 'p'] and args.option in ['f', 'k']):
+                print("binary and packed modes are only supported for integer options -s, -t and -m")
+                exit(1)
+
+        if (args.option == 's' and rrange < n):
+                print("range >= amount must be true for unique sets")
+                print("(range)", rrange,"<", n,"(amount), please change to reasonable constellation")
+                exit(1)
+
+        cache = None
+        if not args.no_cache:
+                os.makedirs(args.cache_dir, exist_ok=True)
+                cache = (args.cache_dir, args.cache_size, args.verify_cache)
+
+        if args.shards:
+                if not args.output:
+                        print("sharded runs require an output file -o <file>")
+                        exit(1)
+                tasks = [(rrange, mode, dtype, args.option, n, args.seed, shard, args.output + "." + str(shard), args.sorted, cache)
+                        for shard in range(args.shards)]
+                with multiprocessing.Pool(max(1, min(args.workers, args.shards))) as pool:
+                        pool.map(write_shard, tasks)
+        else:
+                write_input(args.option, n, args.seed, args.shard, args.output, args.sorted, cache)
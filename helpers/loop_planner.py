@@ -0,0 +1,149 @@
+#! /usr/bin/python3
+
+# Orders the loop iterations of an experiment run by the cost of switching between them, called by
+# setParameters in parameters.sh with --plan. The cartesian loop variables file is replaced by a single
+# "plan" loop variable holding all values of an iteration, measurement.sh reads them with loopvar.
+# The manifest maps the planned iterations back to the cartesian order of the loop file for the export.
+# Resumed runs leave out the iterations completed by earlier attempts, the manifest lists them for the export.
+
+import argparse
+import itertools
+import json
+import re
+import sys
+
+from result_verifier import completed_iterations
+
+# variables that are compile flags of MP-Slice, any change compiles the binaries again
+compile_variables = ["optshare", "packbool", "splitroles", "protocol", "preprocess", "datatype", "ssl", "threads",
+                     "function", "txbuffer", "rxbuffer", "input_size"]
+
+# estimated seconds to switch a value, compiling only counts once per iteration
+compile_cost = 30
+costs = {"ram": 60, "cpus": 10, "freqs": 5, "quotas": 0.5, "latencies": 0.5, "bandwidths": 0.5, "packetdrops": 0.5}
+
+# manipulations measurement.sh keeps applied between iterations with the same value
+kept = ["ram", "cpus", "freqs"]
+
+
+def read_loop_variables(path):
+    """
+    :return: list of the variable names and list of their values, in the order of the loop file
+    """
+    names, values = [], []
+    with open(path) as f:
+        for line in f:
+            match = re.match(r"\s*([\w]+):\s*\[(.*)\]", line)
+            if match:
+                names.append(match.group(1))
+                values.append([value.strip() for value in match.group(2).split(",") if value.strip()])
+    return names, values
+
+
+def transition_cost(names, a, b):
+    changed = [name for name, x, y in zip(names, a, b) if x != y]
+    cost = compile_cost if any(name in compile_variables for name in changed) else 0
+    return cost + sum(costs.get(name, 0) for name in changed)
+
+
+def total_cost(names, steps):
+    return sum(transition_cost(names, a, b) for a, b in zip(steps, steps[1:]))
+
+
+def plan(names, values):
+    """
+    Nests the variables by their switching cost, the most expensive outermost, and traverses the
+    product reflected (boustrophedon), so every step changes exactly one variable
+    :return: planned order as list of indices into the cartesian product of the loop file
+    """
+    nesting = sorted(range(len(names)), key=lambda j: -(costs.get(names[j], compile_cost if names[j] in compile_variables else 0)))
+    # strides of the cartesian index, the first variable of the loop file is the outermost
+    strides = [1] * len(names)
+    for j in range(len(names) - 2, -1, -1):
+        strides[j] = strides[j + 1] * len(values[j + 1])
+
+    # offsets of the innermost level first, every other value of a level runs its inner levels backwards
+    order = [0]
+    for j in reversed(nesting):
+        order = [k * strides[j] + offset for k in range(len(values[j]))
+                 for offset in (reversed(order) if k % 2 else order)]
+    return order
+
+
+# manipulations that are only kept while the ones they depend on are unchanged too, cpupower sets
+# the frequency of the online cores only, cores onlined by limitCPUs need setFrequency again
+depends = {"freqs": ["cpus"]}
+
+
+def get_kept(names, step, other):
+    if not other:
+        return []
+    unchanged = [name for name in names if other[names.index(name)] == step[names.index(name)]]
+    return [name for name in kept if name in unchanged and
+            all(dependency in unchanged for dependency in depends.get(name, []) if dependency in names)]
+
+
+def get_step(names, step, previous, following):
+    # the values of an iteration and the kept manipulations shared with the neighbouring iterations
+    values = [name + "=" + value for name, value in zip(names, step)]
+    reuse = get_kept(names, step, previous)
+    keep = get_kept(names, step, following)
+    return ";".join(values + ["reuse=" + ",".join(reuse), "keep=" + ",".join(keep)])
+
+
+def read_resumed(path, names, cartesian):
+    """
+    :param path: file of the results paths of earlier attempts, one per line
+    :return: dict cartesian index -> results path and loop index of the completed iteration
+    """
+    indices = {step: i for i, step in enumerate(cartesian)}
+    resumed = {}
+    with open(path) as f:
+        resultpaths = [line.strip() for line in f if line.strip()]
+    for resultpath in resultpaths:
+        for j, loop in completed_iterations(resultpath).items():
+            step = tuple(loop.get(name) for name in names)
+            if step in indices:
+                resumed[indices[step]] = (resultpath, j)
+    return resumed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Replaces the cartesian loop variables file with iterations ordered by their switching cost.')
+    parser.add_argument('loopvariables', type=str, help='Required, loop variables file, rewritten in place.')
+    parser.add_argument('manifest', type=str, help='Required, path of the manifest to write.')
+    parser.add_argument('-k', '--keep-order', action='store_true',
+                        help='(Optional) keep the cartesian order of the loop file instead of ordering by cost')
+    parser.add_argument('-r', '--resume', type=str,
+                        help='(Optional) file of the results paths of earlier attempts, their completed iterations are skipped')
+
+    args = parser.parse_args()
+
+    names, values = read_loop_variables(args.loopvariables)
+    cartesian = list(itertools.product(*values))
+    order = list(range(len(cartesian))) if args.keep_order else plan(names, values)
+    resumed = read_resumed(args.resume, names, cartesian) if args.resume else {}
+    order = [i for i in order if i not in resumed]
+    # the export merges the completed iterations of earlier attempts
+    with open(args.manifest, "w") as f:
+        json.dump({"variables": names, "order": order,
+                   "resumed": [[i, resultpath, j] for i, (resultpath, j) in sorted(resumed.items())]}, f)
+    # exit code 3 signals that all iterations are completed already
+    if not order:
+        sys.exit(3)
+    steps = [cartesian[i] for i in order]
+
+    with open(args.loopvariables, "w") as f:
+        f.write("plan: [" + ", ".join(
+            '"' + get_step(names, step, steps[i - 1] if i else None, steps[i + 1] if i + 1 < len(steps) else None) + '"'
+            for i, step in enumerate(steps)) + "]\n")
+
+    # summary line of the run summary
+    info = str(len(steps)) + " iterations"
+    if not args.keep_order:
+        info += ", estimated switching " + str(round(total_cost(names, steps))) + "s instead of " + \
+            str(round(total_cost(names, [cartesian[i] for i in range(len(cartesian)) if i not in resumed]))) + "s"
+    if resumed:
+        info += ", " + str(len(resumed)) + " completed by earlier attempts"
+    print(info)
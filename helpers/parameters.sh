@@ -44,8 +44,21 @@ help() {
     echo "     --threads        Number of parallel processes to use"
     echo "     --txbuffer       Number of gates to buffer until sending them to the receiving party"
     echo "     --rxbuffer       Number of messages to buffer until processing"
+    echo "     --sample         interval in seconds of the cpu, memory and network sampler"
+    echo "                      running alongside the protocol (default 0.1, 0 disables it)"
+    echo "     --bincache       size limit in MiB of the compiled binaries cache on each node,"
+    echo "                      reused when only the environment changes (default 4096, 0 disables it)"
+    echo "     --plan           1 to order the loop iterations by the cost of switching between them,"
+    echo "                      keeping cpu, RAM and frequency manipulations applied while unchanged"
+    echo "     --resume         file of the results paths of earlier attempts, one per line, their completed"
+    echo "                      and verified iterations are skipped and merged into the export. The results"
+    echo "                      path of this run is appended, config runs resume their retries with it"
     echo "     --config         config files run with <path> as parameter, nodes can be given separatly"
     echo "                      allowed form: $0 --config file.conf [nodeA,...]"
+    echo "                      adapt=<flag> lines sweep the flag adaptively over several runs, see README"
+    echo "     --schedule       like --config, but runs the config files concurrently on disjoint groups"
+    echo "                      of nodes with the same hardware, allowed form: $0 --schedule <path> nodeA,..."
+    echo "     --network        internal network number 10.10.<number>.0/24 (2-254, default random)"
     echo -e "\nManipulate Host Environment (optional)"
     echo " -c, --cpu            cpu thread counts, with <Values>"
     echo " -q, --cpuquota       cpu quotas in % (10 < quota), with <Values>"
@@ -110,7 +123,8 @@ setArray() { # load array $1 reference with ,-seperated values in $2
 
 TEMPFILES=()
 ALLOC_ID=""
-EXPORTPATH="resultsMP-Slice/$(date +20%y-%m)/$(date +%d_%H-%M-%S)"
+# reserved in setParameters, empty until then so the cleanup never removes the path of another run
+EXPORTPATH=""
 # pos_upload resultspath
 RPATH=""
 SUMMARYFILE=""
@@ -141,6 +155,11 @@ FUNCTION=( 0 )
 TXBUFFER=( 0 )
 RXBUFFER=( 0 )
 manipulate="6666"
+SAMPLEINTERVAL=0.1
+BINARYCACHE=4096
+PLAN=0
+RESUME=""
+EXPORTINFO=""
 
 INPUTS=( 4096 )
 CPUS=()
@@ -174,7 +193,7 @@ setParameters() {
     LONG+=,nodes:,input:,measureram,cpu:,cpuquota:,freq:,ram:,swap:
     LONG+=,config:,latency:,bandwidth:,packetdrop:,help,dtype:,preproc:
     LONG+=,split:,packbool:,optshare:,ssl:,threads:,manipulate:,function:
-    LONG+=,txbuffer:,rxbuffer:
+    LONG+=,txbuffer:,rxbuffer:,sample:,bincache:,plan:,resume:,schedule:,network:,exportinfo:
 
     PARSED=$(getopt --options ${SHORT} \
                     --longoptions ${LONG} \
@@ -246,6 +265,22 @@ setParameters() {
             --manipulate)
                 manipulate="$2"
                 shift;;
+            --sample)
+                SAMPLEINTERVAL="$2"
+                shift;;
+            --bincache)
+                BINARYCACHE="$2"
+                shift;;
+            --plan)
+                PLAN="$2"
+                shift;;
+            --resume)
+                RESUME="$2"
+                shift;;
+            # internal, file the reserved export path is written to, for the config run
+            --exportinfo)
+                EXPORTINFO="$2"
+                shift;;
             # Host environment manipulation
             -c|--cpu)
                 TTYPES+=( CPUS )
@@ -280,8 +315,16 @@ setParameters() {
                 SWAP="$2"
                 shift;;
             --config)
-                parseConfig "$2" "$4"
+                parseConfig "$2" "$4" "$5"
                 exit 0;;
+            --schedule)
+                # replace this process, the trap would close the config runs otherwise
+                exec python3 helpers/config_scheduler.py "$2" <<< "$4";;
+            --network)
+                [ "$2" -ge 2 ] && [ "$2" -le 254 ] ||
+                    error $LINENO "${FUNCNAME[0]}(): network number $2 not in 2-254"
+                NETWORK="$2"
+                shift;;
             -x)
                 CONFIGRUN=true;;
             *) error $LINENO "${FUNCNAME[0]}(): unrecognized flag $1 $2";;
@@ -297,8 +340,12 @@ setParameters() {
     # set experiment wide variables (append random num to mitigate conflicts)
     # if value may contain a leading 0 (zero), add any char before (like manipulate)
     experimentvarpath="variables/experiment-variables-$NETWORK.yml"
-    echo "experiment: $EXPERIMENT" > "$experimentvarpath"
-    echo "manipulate: m$manipulate" >> "$experimentvarpath"
+    {
+        echo "experiment: $EXPERIMENT"
+        echo "manipulate: m$manipulate"
+        echo "sampleinterval: $SAMPLEINTERVAL"
+        echo "binarycache: $BINARYCACHE"
+    } > "$experimentvarpath"
 
     # generate loop-variables.yml (append random num to mitigate conflicts)
     loopvarpath="variables/loop-variables-$NETWORK.yml"
@@ -323,9 +370,38 @@ setParameters() {
     # delete line measureram from loop_var, if active
     sed -i '/measureram/d' "$loopvarpath"
 
+    # replace the cartesian loop variables with the cost ordered plan, the manifest
+    # maps the iterations back to the cartesian order for the export
+    # and resumed runs skip the iterations completed by earlier attempts
+    manifestpath="variables/loop-manifest-$NETWORK.json"
+    rm -f "$manifestpath"
+    planinfo=""
+    resumedonly=false
+    planflags=()
+    [ "$PLAN" -eq 1 ] || planflags+=( --keep-order )
+    [ -s "$RESUME" ] && planflags+=( --resume "$RESUME" )
+    if [ "$PLAN" -eq 1 ] || [ -s "$RESUME" ]; then
+        planinfo=$(python3 helpers/loop_planner.py "$loopvarpath" "$manifestpath" "${planflags[@]}") || {
+            # exit code 3: nothing left to run, the manifest still lists the completed iterations
+            [ "$?" -eq 3 ] || error $LINENO "${FUNCNAME[0]}(): loop planning failed"
+            okfail ok "all loop iterations completed by earlier attempts"
+            resumedonly=true; }
+    fi
+
     # set default swap size, in case --ram is defined
     [ "${#RAM[*]}" -gt 0 ] && SWAP=${SWAP:-4096}
 
+    # reserve the export path, concurrent runs started in the same second take the next one
+    exportpath="resultsMP-Slice/$(date +20%y-%m)/$(date +%d_%H-%M-%S)"
+    mkdir -p "$(dirname "$exportpath")"
+    until mkdir "$exportpath" 2> /dev/null; do
+        sleep 1
+        exportpath="resultsMP-Slice/$(date +20%y-%m)/$(date +%d_%H-%M-%S)"
+        mkdir -p "$(dirname "$exportpath")"
+    done
+    EXPORTPATH="$exportpath"
+    [ -n "$EXPORTINFO" ] && echo "$EXPORTPATH" > "$EXPORTINFO"
+
     # Experiment run summary information output
     SUMMARYFILE="$EXPORTPATH/Eslice-run-summary.dat"
     mkdir -p "$SUMMARYFILE" && rm -rf "$SUMMARYFILE"
@@ -347,6 +423,10 @@ setParameters() {
         echo "    txBuffer: ${TXBUFFER[*]}"
         echo "    rxBuffer: ${RXBUFFER[*]}"
         [ "$manipulate" != "6666" ] && echo "    manipulate: $manipulate"
+        echo "    Sample interval = ${SAMPLEINTERVAL}s"
+        echo "    Binary cache = ${BINARYCACHE}MiB"
+        [ -s "$RESUME" ] && echo "    Resumed from = $(xargs < "$RESUME")"
+        [ -n "$planinfo" ] && echo "    Loop plan = $planinfo"
         echo "    Testtypes:"
         for type in "${TTYPES[@]}"; do
             declare -n ttypes="${type}"
@@ -354,6 +434,51 @@ setParameters() {
         done
         echo "  Summary file = $SUMMARYFILE"
     } | tee "$SUMMARYFILE"
+
+    # export the iterations completed by earlier attempts into the merged table, with the cleanup
+    if "$resumedonly"; then
+        source helpers/testresults_helper.sh
+        RUNSTATUS="${Green}completed${Stop}"
+        exit 0
+    fi
+}
+
+# run a new instance of sevarebench with the parameters $@, retried on random errors,
+# retries resume with the iterations the earlier attempts did not complete.
+# The export path of the last attempt is stored in EXPORTED
+runConfigInstance() {
+
+    resumefile=$(mktemp -p variables resume-XXXXXX)
+    exportinfo=$(mktemp -p variables export-XXXXXX)
+    retry=1
+    while [ "$retry" -eq 1 ]; do
+        retry=0
+
+        # run a new instance of sevarebench with the parsed parameters
+        # internal flag -x prevents the recursive closing of the process
+        # group in the trap logic that would also close this instance
+        echo "running \"bash $0 $*\""
+        bash "$0" -x "$@" --resume "$resumefile" --exportinfo "$exportinfo"
+
+        # catch retry error codes, set them with the error function in the
+        # getlastoutput() function in the trap_helper.sh or around the framework
+        exitcode=$?
+        if [ "$exitcode" -eq 4 ]; then
+            warning "Random error assumed, trying again. Waiting 5s for nodes to detach..."
+            sleep 5
+            echo
+            retry=1
+        elif [ "$exitcode" -eq 5 ]; then
+            warning "POS timeout, trying again. Waiting 5s for nodes to detach..."
+            sleep 5
+            echo
+            retry=1                    
+        elif [ "$exitcode" -ne 0 ]; then
+            error ${LINENO} "${FUNCNAME[0]}(): stopping config run due to an error"
+        fi
+    done
+    EXPORTED=$(cat "$exportinfo")
+    rm -f "$resumefile" "$exportinfo"
 }
 
 # inspired by https://unix.stackexchange.com/a/206216
@@ -398,6 +523,8 @@ parseConfig() {
         # also allow specifying the nodes via commandline in the form
         # ./sevarebench.sh --config xy.conf nodeA,nodeB,...
         [ -z "${config[nodes]}" ] && config[nodes]="$2"
+        # the scheduler isolates concurrent config runs by their network number
+        [ -n "$3" ] && config[network]="$3"
         # override mode for externally defined nodes
         #[ -n "$2" ] && config[nodes]="$2"
 
@@ -410,38 +537,38 @@ parseConfig() {
             #flagsnparas=( --experiment "$experiment" )
             flagsnparas=( )
             for flag in "${!config[@]}"; do
-                # skip experiment flag
-                [ "$flag" != experiments ] && flagsnparas=( "${flagsnparas[@]}" --"$flag" "${config[$flag]}" )
+                # skip experiment flag, the adaptive sweep settings and the adapted flag
+                [ "$flag" != experiments ] && [ "${flag::5}" != adapt ] && [ "$flag" != "${config[adapt]}" ] &&
+                    flagsnparas=( "${flagsnparas[@]}" --"$flag" "${config[$flag]}" )
             done
 
-            retry=1
-            while [ "$retry" -eq 1 ]; do
-                retry=0
-
-                # run a new instance of sevarebench with the parsed parameters
-                # internal flag -x prevents the recursive closing of the process
-                # group in the trap logic that would also close this instance
-                echo "running \"bash $0 ${flagsnparas[*]}\""
-                bash "$0" -x "${flagsnparas[@]}"
-
-                # catch retry error codes, set them with the error function in the
-                # getlastoutput() function in the trap_helper.sh or around the framework
-                exitcode=$?
-                if [ "$exitcode" -eq 4 ]; then
-                    warning "Random error assumed, trying again. Waiting 5s for nodes to detach..."
-                    sleep 5
-                    echo
-                    retry=1
-                elif [ "$exitcode" -eq 5 ]; then
-                    warning "POS timeout, trying again. Waiting 5s for nodes to detach..."
-                    sleep 5
-                    echo
-                    retry=1                    
-                elif [ "$exitcode" -ne 0 ]; then
-                    error ${LINENO} "${FUNCNAME[0]}(): stopping config run due to an error"
-                fi
+            if [ -z "${config[adapt]}" ]; then
+                runConfigInstance "${flagsnparas[@]}"
+                continue
+            fi
+
+            # adaptive sweep, every run measures the values chosen from the results of the runs before
+            state="variables/adaptive-sweep-$(basename "$conf" .conf).json"
+            # bisect fails without a target
+            target=()
+            [ -n "${config[adapttarget]}" ] && target=( -t "${config[adapttarget]}" )
+            python3 helpers/adaptive_sweep.py init "$state" "${config[adapt]}" "${config[adaptrange]}" \
+                "${config[adapttolerance]}" "${target[@]}" -m "${config[adaptmethod]:-bisect}" ||
+                error ${LINENO} "${FUNCNAME[0]}(): invalid adaptive sweep settings in $conf"
+            values=$(python3 helpers/adaptive_sweep.py next "$state")
+            run=1
+            while [ -n "$values" ] && [ "$run" -le "${config[adaptruns]:-10}" ]; do
+                echo "  adaptive sweep run $run: --${config[adapt]} $values"
+                runConfigInstance "${flagsnparas[@]}" --"${config[adapt]}" "$values"
+                # the results table exported by the last attempt of this run, merged with the earlier ones,
+                # concurrent runs of the scheduler export into the same tree
+                table="$EXPORTED/data/Eslice_short_results.csv"
+                values=$(python3 helpers/adaptive_sweep.py next "$state" "$table")
+                ((++run))
             done
-                
+            echo "  adaptive sweep result of $conf:"
+            python3 helpers/adaptive_sweep.py report "$state" | sed 's/^/    /'
+
         done <<< "${config[experiments]}",
 
     done
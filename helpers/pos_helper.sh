@@ -17,6 +17,8 @@ initializePOS() {
 	echo "$ALLOC_ID"
 	RPATH=$(echo "$ALLOC_ID" | grep Results | awk '{print $3}')
 	ALLOC_ID=$(echo "$ALLOC_ID" | grep Alloc | awk '{print $3}')
+	# later attempts resume with the iterations completed in this results path
+	[ -n "$RESUME" ] && echo "$RPATH/${NODES[0]}/" >> "$RESUME"
 
 	echo "  setting image of host(s) ${NODES[*]} to $IMAGE"
 	for node in "${NODES[@]}"; do
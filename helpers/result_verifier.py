@@ -0,0 +1,118 @@
+#! /usr/bin/python3
+
+# Verification of the pos_upload-ed protocol outputs, called by verifyExperiment in testresults_helper.sh.
+# The results directory is indexed once and the loop iterations are checked in parallel. Every result
+# the protocol instances printed has to be the search hit of the built-in inputs.
+
+import argparse
+import concurrent.futures
+import json
+import re
+import sys
+
+from testresults_helper import index_results, read_loop
+
+# the search result is printed as a line of its own holding the bit string, like 00000001,
+# one per protocol instance
+result_pattern = re.compile(r"^\s*([01]{8,})\s*$", re.MULTILINE)
+# the built-in inputs contain the searched element
+expected = 1
+# exit status of /bin/time in the testresults, 124 is the timeout of the protocol run
+status_pattern = re.compile(r"exited with non-zero status (\d+)")
+
+
+def verify_loop(task):
+    """
+    :param task: loop index, loop info, testresults and terminal output path
+    :return: loop index and verification entry
+    """
+    i, loopinfo, testresults, terminal = task
+    entry = {"index": i, "loop": read_loop(loopinfo)}
+    # skipped like before, not counted as failed
+    if terminal is None:
+        return i, dict(entry, status="missing")
+
+    if testresults is not None:
+        with open(testresults, errors="replace") as f:
+            statuses = status_pattern.findall(f.read())
+        # the first status could belong to the compile step, a timeout is only caused by the protocol run
+        if "124" in statuses:
+            return i, dict(entry, status="timeout")
+
+    with open(terminal, errors="replace") as f:
+        results = [int(result, 2) for result in result_pattern.findall(f.read())]
+    if not results:
+        return i, dict(entry, status="noresult", expected=expected)
+    wrong = [result for result in results if result != expected]
+    if wrong:
+        return i, dict(entry, status="mismatch", expected=expected, result=wrong[0])
+    return i, dict(entry, status="ok", expected=expected, result=expected)
+
+
+def verify(resultpath, summary=None, workers=None):
+    """
+    Checks all loop iterations until the first missing loop index
+    :param summary: path of the machine-readable summary to write, as json
+    :return: list of the verification entries in loop order
+    """
+    loops, testresults, terminals, _ = index_results(resultpath)
+    tasks = []
+    while len(tasks) in loops:
+        i = len(tasks)
+        tasks.append((i, loops[i], testresults.get(i), terminals.get(i)))
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        entries = [entry for _, entry in pool.map(verify_loop, tasks, chunksize=16)]
+
+    if summary:
+        statuses = {}
+        for entry in entries:
+            statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+        with open(summary, "w") as f:
+            json.dump({"resultpath": resultpath, "loops": len(entries), "statuses": statuses,
+                       "failed": [entry for entry in entries if entry["status"] not in ("ok", "missing")],
+                       "skipped": [entry for entry in entries if entry["status"] == "missing"]}, f, indent=1)
+    return entries
+
+
+def completed_iterations(resultpath):
+    """
+    Iterations of an earlier attempt that ran to the end and passed the verification
+    :return: dict loop index -> loop values
+    """
+    _, testresults, _, _ = index_results(resultpath)
+    completed = {}
+    for entry in verify(resultpath):
+        if entry["status"] != "ok" or entry["index"] not in testresults:
+            continue
+        with open(testresults[entry["index"]], errors="replace") as f:
+            if "experiment finished" in f.read():
+                completed[entry["index"]] = entry["loop"]
+    return completed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Verifies the protocol outputs of all loop iterations of an experiment run.')
+    parser.add_argument('resultpath', type=str, help='Required, pos results path of the first node.')
+    parser.add_argument('-o', '--output', type=str, help='(Optional) path of the json summary to write')
+    parser.add_argument('-j', '--workers', type=int, help='(Optional) number of verifying processes (default: all cores)')
+
+    args = parser.parse_args()
+
+    entries = verify(args.resultpath, args.output, args.workers)
+    for entry in entries:
+        if entry["status"] == "missing":
+            print("    Skip loop " + str(entry["index"]) + " - File not found error: terminal_output_run*" +
+                  str(entry["index"]) + ".txt")
+    failed = [entry for entry in entries if entry["status"] not in ("ok", "missing")]
+    # the first errors in the log, all of them in the summary
+    for entry in failed[:10]:
+        details = "".join(" " + key + "=" + str(entry[key]) for key in ("expected", "result") if key in entry)
+        print("    Error loop " + str(entry["index"]) + " - " + entry["status"] + details + " " +
+              ";".join(name + "=" + value for name, value in entry["loop"].items()))
+    if len(failed) > 10:
+        print("    ... " + str(len(failed) - 10) + " more errors")
+
+    # exit code 2: no loop iteration found, 1: failed iterations
+    sys.exit(2 if not entries else 1 if failed else 0)
@@ -0,0 +1,266 @@
+#! /usr/bin/python3
+
+# Export of the pos_upload-ed measurement logs into the results table, called by
+# exportExperimentResults in testresults_helper.sh. The results directory is indexed
+# once and the testresults files are parsed in parallel.
+
+import argparse
+import concurrent.futures
+import json
+import os
+import re
+import sys
+
+# the resource sampler of the hosts defines the time series format
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "host_scripts"))
+from resource_sampler import read_samples
+
+# the loop index is the number at the end of the pos file names
+loop_pattern = re.compile(r"(\d+)\.loop")
+testresults_pattern = re.compile(r"^testresults.*?(\d+)$")
+terminal_pattern = re.compile(r"^terminal_output_run.*?(\d+)\.txt$")
+resources_pattern = re.compile(r"^resources.*?(\d+)$")
+
+# lines of the testresults files holding the measurements
+metric_pattern = re.compile(r"Elapsed wall clock|Maximum resident|Binary file size|measured to initialize program"
+                            r"|preprocessing chrono|computation clock|computation getTime|computation chrono"
+                            r"|CPU this job|Global data sent =|Data sent =|Instance timings \w+:")
+
+# units of the environment manipulation columns
+column_units = {"freqs": "(GHz)", "quotas": "(%)", "packetdrops": "(%)", "latencies": "(ms)", "bandwidths": "(Mbs)"}
+
+basicInfo1 = ["comp.time(s)", "comp.peakRAM(MiB)", "bin.filesize(MiB)"]
+basicInfo2 = ["inittime(s)", "preproc(s)", "runtime_clock(s)", "runtime_getTime(s)", "runtime_chrono(s)",
+              "runtime_external(s)", "peakRAM(MiB)", "jobCPU(%)", "P0commRounds", "P0dataSent(MB)", "ALLdataSent(MB)"]
+# distribution of the concurrent instances of split role and multi-threaded runs, from instance_timings.py
+instance_phases = ["init", "chrono"]
+instance_stats = ["min", "p50", "p90", "p99", "max", "mean"]
+basicInfo3 = [phase + "_" + stat + "(s)" for phase in instance_phases for stat in instance_stats]
+stats_pattern = re.compile(r"(\w+)=([\d.]+)")
+# summary of the sampled time series of resource_sampler.py, the timeline file holds it downsampled
+basicInfo4 = ["cpuUtil(%)", "coreUtilMax(%)", "sampledRSS(MiB)", "txRate(Mbs)", "txRateMax(Mbs)", "rxRate(Mbs)", "timeline"]
+# rows of the timeline files, samples are averaged into buckets above
+timeline_rows = 200
+
+
+def index_results(resultpath):
+    """
+    Walks the results directory once
+    :return: dicts loop index -> path for the loop info, testresults, terminal output and resource samples files
+    """
+    loops, testresults, terminals, resources = {}, {}, {}, {}
+    for root, _, files in os.walk(resultpath):
+        for name in files:
+            for pattern, index in ((loop_pattern, loops), (testresults_pattern, testresults),
+                                   (terminal_pattern, terminals), (resources_pattern, resources)):
+                match = pattern.search(name)
+                if match:
+                    index.setdefault(int(match.group(1)), os.path.join(root, name))
+                    break
+    return loops, testresults, terminals, resources
+
+
+def read_loop(path):
+    with open(path) as f:
+        loop = json.load(f)
+    if "plan" in loop:
+        # iteration of a planned run, like "protocol=2;datatype=64;...;reuse=;keep=freqs", see loop_planner.py
+        values = dict(value.split("=", 1) for value in loop["plan"].split(";"))
+        return {key: value for key, value in values.items() if key not in ("reuse", "keep")}
+    return {key: value if isinstance(value, str) else json.dumps(value) for key, value in loop.items()}
+
+
+def get_header(loop):
+    dyncolumns = [name + column_units.get(name, "") for name in loop]
+    return ";".join(basicInfo1 + dyncolumns + basicInfo2 + basicInfo3 + basicInfo4)
+
+
+def read_metrics(path):
+    """
+    :return: dicts keyword -> all lines containing it, in order, of the compile step (or the restore of
+        cached binaries) before the ======== separator of measurement.sh, and of the whole file
+    """
+    compiled, matches = {}, {}
+    section = compiled
+    with open(path, errors="replace") as f:
+        for line in f:
+            if line.startswith("========"):
+                section = None
+                continue
+            match = metric_pattern.search(line)
+            if match:
+                matches.setdefault(match.group(0), []).append(line.rstrip("\n"))
+                if section is not None:
+                    section.setdefault(match.group(0), []).append(line.rstrip("\n"))
+    return compiled, matches
+
+
+def last(lines):
+    return lines[-1] if lines else ""
+
+
+def field(line, n):
+    # whitespace separated field n, starting at 1
+    fields = line.split()
+    return fields[n - 1] if len(fields) >= n else ""
+
+
+def first_word(line):
+    return line.split(" ")[0]
+
+
+def to_MiB(kbytes):
+    try:
+        return str(int(kbytes) // 1024)
+    except ValueError:
+        return "NA"
+
+
+def instance_timings(line):
+    # like "Instance timings chrono: min=0.1 p50=0.2 p90=0.3 p99=0.3 max=0.4 mean=0.2 instances=24 (s)"
+    stats = dict(stats_pattern.findall(line))
+    return [stats.get(stat, "NA") for stat in instance_stats]
+
+
+def read_resources(path, timeline):
+    """
+    Summarizes the sampled time series and writes it downsampled into the timeline file,
+    columns time(s), mean, highest and lowest core utilization(%), RSS(MiB), tx and rx rate(Mbs)
+    :return: summary columns, NA if there are less than two samples
+    """
+    samples = read_samples(path)[1] if path else []
+    if len(samples) < 2:
+        return ["NA"] * len(basicInfo4)
+    cores = len(samples[0][4])
+    rates = []
+    for (t0, _, rx0, tx0, _), (t, _, rx, tx, _) in zip(samples, samples[1:]):
+        # bytes -> Mbit per second
+        rates.append((t, (tx - tx0) * 8e-6 / (t - t0), (rx - rx0) * 8e-6 / (t - t0)))
+    utilization = [sum(sample[4]) / cores for sample in samples[1:]]
+    coreUtil = [sum(sample[4][c] for sample in samples[1:]) / len(rates) for c in range(cores)]
+    duration = samples[-1][0] - samples[0][0]
+
+    with open(timeline, "w") as f:
+        size = -(-len(rates) // timeline_rows)
+        for b in range(0, len(rates), size):
+            bucket = range(b + 1, min(b + size, len(rates)) + 1)
+            n = len(bucket)
+            f.write("\t".join("{:.6g}".format(value) for value in [
+                samples[bucket[-1]][0], sum(utilization[s - 1] for s in bucket) / n,
+                max(max(samples[s][4]) for s in bucket), min(min(samples[s][4]) for s in bucket),
+                max(samples[s][1] for s in bucket) / 1024, sum(rates[s - 1][1] for s in bucket) / n,
+                sum(rates[s - 1][2] for s in bucket) / n]) + "\n")
+
+    return ["{:.1f}".format(value) for value in [
+        sum(utilization) / len(utilization), max(coreUtil), max(sample[1] for sample in samples) / 1024,
+        (samples[-1][3] - samples[0][3]) * 8e-6 / duration, max(rate[1] for rate in rates),
+        (samples[-1][2] - samples[0][2]) * 8e-6 / duration]] + [os.path.basename(timeline)]
+
+
+def get_row(task):
+    """
+    :param task: row position, loop info path, testresults path, resource samples path and timeline path
+    :return: row position and table row, None as row if the testresults file is missing
+    """
+    i, loopinfo, runtimeinfo, resources, timeline = task
+    loopvalues = "".join(value + ";" for value in read_loop(loopinfo).values())
+    if runtimeinfo is None:
+        return i, None
+
+    compiled, metrics = read_metrics(runtimeinfo)
+    wallclock = metrics.get("Elapsed wall clock", [])
+    resident = metrics.get("Maximum resident", [])
+
+    # the timing of config.sh is printed last in the compile step
+    compiletime = first_word(last(compiled.get("Elapsed wall clock", []))) or "NA"
+    compilemaxRAMused = to_MiB(first_word(last(compiled.get("Maximum resident", []))))
+    binfsize = first_word(last(metrics.get("Binary file size", []))) or "NA"
+    # the times are printed with unit s
+    inittime = field(last(metrics.get("measured to initialize program", [])), 6) or "NAs"
+    preproctime = field(last(metrics.get("preprocessing chrono", [])), 7) or "NAs"
+    runtimeclock = field(last(metrics.get("computation clock", [])), 7)
+    runtimegetTime = field(last(metrics.get("computation getTime", [])), 7)
+    runtimechrono = field(last(metrics.get("computation chrono", [])), 7)
+    runtimeext = first_word(last(wallclock)) or "NA"
+    maxRAMused = to_MiB(first_word(last(resident)))
+    jobCPU = last(metrics.get("CPU this job", [])).split("%")[0]
+    # communication of player 0, like "Data sent = 0.7 MB in ~40 rounds (party 0)"
+    commRounds = field(last(metrics.get("Data sent =", [])), 7).lstrip("~") or "NA"
+    dataSent = field(last(metrics.get("Data sent =", [])), 4) or "NA"
+    globaldataSent = field(last(metrics.get("Global data sent =", [])), 5) or "NA"
+    distributions = []
+    for phase in instance_phases:
+        distributions += instance_timings(last(metrics.get("Instance timings " + phase + ":", [])))
+
+    basicInfo = ";".join([compiletime, compilemaxRAMused, binfsize])
+    times = ";".join(value[:-1] for value in [inittime, preproctime, runtimeclock, runtimegetTime, runtimechrono])
+    return i, basicInfo + ";" + loopvalues + times + ";" + ";".join(
+        [runtimeext, maxRAMused, jobCPU, commRounds, dataSent, globaldataSent] + distributions +
+        read_resources(resources, timeline))
+
+
+def export(resultpath, datatable, workers=None, manifest=None):
+    """
+    Writes the results table of all loop iterations, in loop order until the first missing loop index
+    :param manifest: loop manifest of a planned or resumed run, the rows are written in the cartesian order
+        of the loop file, together with the iterations completed by earlier attempts
+    :return: number of exported rows, -1 if no loop file was found
+    """
+    order, resumed = None, []
+    if manifest:
+        with open(manifest) as f:
+            manifest = json.load(f)
+        order, resumed = manifest["order"], manifest.get("resumed", [])
+
+    # the downsampled resource time series are written next to the table
+    timelines = os.path.join(os.path.dirname(datatable), "timelines")
+    tasks = []
+    loops, testresults, _, resources = index_results(resultpath)
+    while len(tasks) in loops:
+        i = len(tasks)
+        position = order[i] if order else i
+        tasks.append((position, loops[i], testresults.get(i), resources.get(i),
+                      os.path.join(timelines, "loop" + str(position) + ".tsv")))
+    # earlier attempts are indexed once per results path
+    indexed = {}
+    for position, path, j in resumed:
+        if path not in indexed:
+            indexed[path] = index_results(path)
+        loops, testresults, _, resources = indexed[path]
+        if j in loops:
+            tasks.append((position, loops[j], testresults.get(j), resources.get(j),
+                          os.path.join(timelines, "loop" + str(position) + ".tsv")))
+    if not tasks:
+        return -1
+    if any(task[3] for task in tasks):
+        os.makedirs(timelines, exist_ok=True)
+
+    rows = []
+    with open(datatable, "w") as table:
+        table.write(get_header(read_loop(tasks[0][1])) + "\n")
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            for i, row in pool.map(get_row, tasks, chunksize=16):
+                if row is None:
+                    print("    Skip - File not found error: testresults*" + str(i))
+                    continue
+                if order is None:
+                    table.write(row + "\n")
+                rows.append((i, row))
+        if order is not None:
+            table.write("".join(row + "\n" for _, row in sorted(rows)))
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Exports the pos_upload-ed measurement logs of an experiment run into a results table.')
+    parser.add_argument('resultpath', type=str, help='Required, pos results path of the first node.')
+    parser.add_argument('datatable', type=str, help='Required, path of the .csv table to write.')
+    parser.add_argument('-j', '--workers', type=int, help='(Optional) number of parsing processes (default: all cores)')
+    parser.add_argument('-m', '--manifest', type=str,
+                        help='(Optional) loop manifest of a run planned with --plan or resumed, restores the cartesian row order')
+
+    args = parser.parse_args()
+
+    # exit code 2 signals that no loop file exists
+    sys.exit(2 if export(args.resultpath, args.datatable, args.workers, args.manifest) < 0 else 0)
@@ -4,40 +4,16 @@
 # where we find the experiment results
 resultpath="$RPATH/${NODES[0]}/"
 
-# verify testresults
+# verify testresults, the summary of every failed loop iteration is written next to the run summary
 verifyExperiment() {
 
-    i=0
-    failcount=0
-    loopinfo=$(find "$resultpath" -name "*$i.loop*" -print -quit)
-    # while we find a next loop info file do
-    while [ -n "$loopinfo" ]; do
-
-        # get pos filepath of the measurements for the current loop
-        experimentresult=$(find "$resultpath" -name "terminal_output_run*$i".txt -print -quit)
-
-        # check existance of files
-        if [ ! -f "$experimentresult" ]; then
-            styleOrange "  Skip $protocol - File not found error: $experimentresult"
-        else
-            # verify experiment result - call experiment specific verify script
-            result=$(grep -c "00000001" "$experimentresult")
-            if [ "$result" == 0 ]; then
-                styleOrange "    Error $protocol - 00000001 not found in $experimentresult"
-                ((++failcount))
-            fi
-        fi
-        if [ "$failcount" -gt 10 ]; then
-            okfail fail "  stopping verification after 10 Errors"
-            return
-        fi
-        ((++i))
-        loopinfo=$(find "$resultpath" -name "*$i.loop*" -print -quit)
-    done
-
-    # only pass if while-loop actually entered
-    [ "$i" -gt 0 ] && okfail ok "  done - test finished"
-
+    python3 "$(dirname "${BASH_SOURCE[0]}")"/result_verifier.py "$resultpath" -o "$EXPORTPATH/Eslice-verification.json"
+    case "$?" in
+        0) okfail ok "  done - test finished";;
+        1) okfail fail "  failed loop iterations, see $EXPORTPATH/Eslice-verification.json";;
+        # exit code 2: no loop iteration found
+        *) styleOrange "  Skip - no loop iteration found in $resultpath";;
+    esac
 }
 
 ############
@@ -51,86 +27,25 @@ exportExperimentResults() {
     mkdir -p "$datatableShort"
     rm -rf "$datatableShort"
 
-    dyncolumns=""
-    # get the dynamic column names from the first .loop info file
-    loopinfo=$(find "$resultpath" -name "*loop*" -print -quit)
-    
-    # check if loop file exists
-    if [ -z "$loopinfo" ]; then
+    # index the results once and parse all testresults files in parallel,
+    # writes the header with the dynamic columns from the first .loop info file
+    echo "  exporting testresults"
+    # runs planned with --plan or resumed are written in the cartesian order of their loop variables,
+    # resumed runs together with the iterations completed by earlier attempts
+    manifestpath="variables/loop-manifest-$NETWORK.json"
+    manifest=()
+    if [ -f "$manifestpath" ]; then
+        manifest=( -m "$manifestpath" )
+        cp "$manifestpath" "$EXPORTPATH/data/"
+    fi
+    python3 "$(dirname "${BASH_SOURCE[0]}")"/testresults_helper.py "$resultpath" "$datatableShort" "${manifest[@]}"
+    # exit code 2: check if loop file exists
+    if [ "$?" -eq 2 ]; then
         okfail fail "nothing to export - no loop file found"
+        rm -f "$datatableShort"
         return
     fi
 
-    for columnname in $(jq -r 'keys_unsorted[]' "$loopinfo"); do
-        dyncolumns+="$columnname"
-        case "$columnname" in
-            freqs) dyncolumns+="(GHz)";;
-            quotas|packetdrops) dyncolumns+="(%)";;
-            latencies) dyncolumns+="(ms)";;
-            bandwidths) dyncolumns+="(Mbs)";;
-        esac
-        dyncolumns+=";"
-    done
-
-    # generate header line of data dump with column information
-    basicInfo1="comp.time(s);comp.peakRAM(MiB);bin.filesize(MiB);"
-    basicInfo2="${dyncolumns}inittime(s);preproc(s);runtime_clock(s);runtime_getTime(s);runtime_chrono(s);runtime_external(s);peakRAM(MiB);jobCPU(%)"
-    echo -e "${basicInfo1}${basicInfo2}" > "$datatableShort"
-
-    i=0
-    # get loopfile path for the current variables
-    loopinfo=$(find "$resultpath" -name "*$i.loop*" -print -quit)
-    echo "  exporting testresults"
-    # while we find a next loop info file do
-    while [ -n "$loopinfo" ]; do
-        loopvalues=""
-        # extract loop variables/switches values
-        for value in $(jq -r 'values[]' "$loopinfo"); do
-            loopvalues+="$value;"
-        done
-        
-        # get pos filepath of the measurements for the current loop
-        runtimeinfo=$(find "$resultpath" -name "testresults*$i" -print -quit)
-        if [ ! -f "$runtimeinfo" ]; then
-            styleOrange "    Skip - File not found error: testresults*$i"
-            ((++i))
-            loopinfo=$(find "$resultpath" -name "*$i.loop*" -print -quit)
-            continue
-        fi
-
-        # extract measurement
-        compiletime=$(grep "Elapsed wall clock" "$runtimeinfo" | head -n 2 | tail -n 1 | cut -d ' ' -f 1)
-        compilemaxRAMused=$(grep "Maximum resident" "$runtimeinfo" | head -n 2 | tail -n 1 | cut -d ' ' -f 1)
-        binfsize=$(grep "Binary file size" "$runtimeinfo" | tail -n 1 | cut -d ' ' -f 1)
-        [ -n "$compilemaxRAMused" ] && compilemaxRAMused="$((compilemaxRAMused/1024))"
-        inittime=$(grep "measured to initialize program" "$runtimeinfo" | tail -n 1 | awk '{print $6}')
-        inittime=${inittime:-NAs}
-        preproctime=$(grep "preprocessing chrono" "$runtimeinfo" | tail -n 1 | awk '{print $7}')
-        preproctime=${preproctime:-NAs}
-        runtimeclock=$(grep "computation clock" "$runtimeinfo" | tail -n 1 | awk '{print $7}')
-        runtimegetTime=$(grep "computation getTime" "$runtimeinfo" | tail -n 1 | awk '{print $7}')
-        runtimechrono=$(grep "computation chrono" "$runtimeinfo" | tail -n 1 | awk '{print $7}')
-        runtimeext=$(grep "Elapsed wall clock" "$runtimeinfo" | tail -n 1 | cut -d ' ' -f 1)
-        maxRAMused=$(grep "Maximum resident" "$runtimeinfo" | tail -n 1 | cut -d ' ' -f 1)
-        [ -n "$maxRAMused" ] && maxRAMused="$((maxRAMused/1024))"
-        jobCPU=$(grep "CPU this job" "$runtimeinfo" | tail -n 1 | cut -d '%' -f 1)
-        maxRAMused=${maxRAMused:-NA}
-        compilemaxRAMused=${compilemaxRAMused:-NA}
-
-        commRounds=$(grep "Data sent =" "$runtimeinfo" | awk '{print $7}')
-        dataSent=$(grep "Data sent =" "$runtimeinfo" | awk '{print $4}')
-        globaldataSent=$(grep "Global data sent =" "$runtimeinfo" | awk '{print $5}')
-        basicComm="${commRounds:-NA};${dataSent:-NA};${globaldataSent:-NA}"
-
-        # put all collected info into one row (Short)
-        basicInfo="${compiletime:-NA};$compilemaxRAMused;${binfsize:-NA}"
-        echo -e "$basicInfo;$loopvalues${inittime::-1};${preproctime::-1};${runtimeclock::-1};${runtimegetTime::-1};${runtimechrono::-1};${runtimeext:-NA};$maxRAMused;$jobCPU" >> "$datatableShort"
-
-        # locate next loop file
-        ((++i))
-        loopinfo=$(find "$resultpath" -name "*$i.loop*" -print -quit)
-    done
-
     # check if there was something exported
     rowcount=$(wc -l "$datatableShort" | awk '{print $1}')
     if [ "$rowcount" -lt 2 ];then
@@ -162,16 +77,18 @@ exportExperimentResults() {
 
     # push to measurement data git
     repourl=$(grep "repoupload" global-variables.yml | cut -d ':' -f 2-)
-    # check if upload git does not exist yet
-    if [ ! -d git-upload/.git ]; then
-        # clone the upload git repo
-        # default to trust server fingerprint authenticity (usually insecure)
-        GIT_SSH_COMMAND='ssh -o StrictHostKeyChecking=accept-new' git clone "${repourl// /}" git-upload
-    fi
-
     echo "  pushing experiment measurement data to git repo$repourl"
-    cd git-upload || error ${LINENO} "${FUNCNAME[0]} cd into gitrepo failed"
     {
+        # concurrent runs of the scheduler share the upload repo
+        flock 9
+        # check if upload git does not exist yet
+        if [ ! -d git-upload/.git ]; then
+            # clone the upload git repo
+            # default to trust server fingerprint authenticity (usually insecure)
+            GIT_SSH_COMMAND='ssh -o StrictHostKeyChecking=accept-new' git clone "${repourl// /}" git-upload
+        fi
+
+        cd git-upload || error ${LINENO} "${FUNCNAME[0]} cd into gitrepo failed"
         # a pull is not really required, but for small sizes it doesn't hurt
         git pull
         # copy from local folder to git repo folder
@@ -180,6 +97,6 @@ exportExperimentResults() {
         git add . 
         git commit -a -m "script upload"
         git push 
-    } &> /dev/null || error ${LINENO} "${FUNCNAME[0]} git upload failed"
+    } 9> git-upload.lock &> /dev/null || error ${LINENO} "${FUNCNAME[0]} git upload failed"
         okfail ok " upload success" 
 }
@@ -37,7 +37,8 @@ cleanup() {
     # create and push Result Plots  
     exportExperimentResults
   else
-    rm -rf "$EXPORTPATH" &> /dev/null
+    # only the export path reserved by this run, empty before
+    [ -n "$EXPORTPATH" ] && rm -rf "$EXPORTPATH" &> /dev/null
   fi
 
   # only close if not in configrun mode
@@ -55,6 +56,9 @@ trap cleanup 0
 
 configruntrap() {
   echo "done with config file run"
+  # keep the exit code of the config run for the scheduler, the kill
+  # below would terminate this process as well
+  trap '' 15
   # this looks up the process group of this script and
   # gracefully closes them. Otherwise running this script
   # can leave zombie processes   
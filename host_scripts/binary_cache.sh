@@ -0,0 +1,48 @@
+#!/bin/bash
+# shellcheck disable=SC2154
+
+#
+# Cache of the compiled protocol binaries, sourced by measurement.sh. Entries are keyed by
+# the MP-Slice commit and all compile flags, so loop iterations only changing the environment
+# manipulation reuse the binaries instead of compiling them again.
+#
+
+cachedir="$HOME"/binarycache
+
+# print the cache key of the compile flags $@
+getCacheKey() {
+    echo "$(git -C "$REPO_DIR" rev-parse HEAD) $*" | sha256sum | cut -d ' ' -f 1
+}
+
+# copy the binaries of key $1 into the current folder, timed like the compile step,
+# fails if there is no entry
+restoreBinaries() {
+    [ -d "$cachedir/$1" ] || return 1
+    rm -f search-P*
+    /bin/time -f "$timerf" cp "$cachedir/$1"/search-P* .
+    # the modification time orders the eviction, least recently used first
+    touch "$cachedir/$1"
+}
+
+# add the binaries of the current folder as key $1 and evict entries above $2 MiB
+storeBinaries() {
+    key=$1
+    maxsize=$2
+    compgen -G "search-P*" > /dev/null || return 0
+    mkdir -p "$cachedir"
+    rm -rf "${cachedir:?}/$key.tmp"
+    mkdir "$cachedir/$key.tmp"
+    # complete entries only, an aborted copy stays .tmp
+    cp search-P* "$cachedir/$key.tmp"/
+    rm -rf "${cachedir:?}/$key"
+    mv "$cachedir/$key.tmp" "$cachedir/$key"
+
+    while [ "$(du -sm "$cachedir" | cut -f 1)" -gt "$maxsize" ]; do
+        # shellcheck disable=SC2012
+        oldest=$(ls -tr "$cachedir" | head -n 1)
+        rm -rf "${cachedir:?}/$oldest"
+        # a single entry above the limit is not kept either
+        [ "$oldest" == "$key" ] && break
+    done
+    return 0
+}
@@ -0,0 +1,89 @@
+#! /usr/bin/python3
+
+# Aggregation of the timings of all concurrently running protocol instances, called by
+# measurement.sh with split roles or more than one thread. Appends the averaged summary
+# lines read by the export and one distribution line per phase, to see stragglers.
+
+import argparse
+import re
+
+# phase -> testresults keyword and summary line
+phases = {
+    "init": ("measured to initialize program", "Time measured to initialize program: {}s"),
+    "clock": ("computation clock", "Time measured to perform computation clock: {}s"),
+    "getTime": ("computation getTime", "Time measured to perform computation getTime: {}s"),
+    "chrono": ("computation chrono", "Time measured to perform computation chrono: {}s"),
+}
+
+# the instance time is the number before the unit s after the colon
+time_pattern = re.compile(r":\s*([\d.]+(?:[eE][-+]?\d+)?)\s*s")
+
+# distribution line of a phase, like "Instance timings chrono: min=0.1 p50=0.2 ... mean=0.2 instances=24 (s)"
+stats_names = ["min", "p50", "p90", "p99", "max", "mean"]
+
+
+def read_timings(path):
+    """
+    :return: dict phase -> times of all instances, in order, and the external runtimes
+    """
+    timings = {phase: [] for phase in phases}
+    external = []
+    with open(path, errors="replace") as f:
+        for line in f:
+            if line.startswith("Instance timings"):
+                continue
+            if "Elapsed wall clock" in line:
+                external.append(line.split(" ")[0])
+                continue
+            for phase, (keyword, _) in phases.items():
+                if keyword in line:
+                    match = time_pattern.search(line)
+                    if match:
+                        timings[phase].append(float(match.group(1)))
+                    break
+    return timings, external
+
+
+def percentile(ordered, p):
+    # linear interpolation between the closest ranks, like numpy's default
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def get_stats(times):
+    ordered = sorted(times)
+    return [ordered[0], percentile(ordered, 50), percentile(ordered, 90), percentile(ordered, 99), ordered[-1],
+            sum(ordered) / len(ordered)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Aggregates the timings of concurrent protocol instances in a testresults file.')
+    parser.add_argument('testresults', type=str, help='Required, testresults file of the run.')
+    parser.add_argument('instances', type=int, help='Required, number of concurrently running instances.')
+
+    args = parser.parse_args()
+
+    timings, external = read_timings(args.testresults)
+    lines = []
+    for phase, (_, summary) in phases.items():
+        times = timings[phase]
+        if not times:
+            continue
+        stats = get_stats(times)
+        # the mean of the instances normalized by the number of instances sharing the run, as before
+        lines.append(summary.format("{:.6f}".format(stats[-1] / args.instances)))
+        lines.append("Instance timings " + phase + ": " + " ".join(
+            name + "=" + "{:.6f}".format(value) for name, value in zip(stats_names, stats)) +
+            " instances=" + str(len(times)) + " (s)")
+    if external:
+        try:
+            lines.append("{:.6f}".format(float(external[-1]) / args.instances) +
+                         " (Elapsed wall clock time in seconds)")
+        except ValueError:
+            pass
+
+    with open(args.testresults, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
@@ -5,7 +5,7 @@ set -e
 
 limitCPUs() {
 
-    cpus=$(pos_get_variable cpus --from-loop)
+    cpus=$(loopvar cpus)
     # activate cpu_count many cpu cores (omit cpu0)
     cpupath=/sys/devices/system/cpu/cpu1/online
     i=2
@@ -23,7 +23,7 @@ limitRAM() {
 
     # only manipulate ram if there was a swapfile created
     if [ -f /swp/swp_file ];then
-        ram=$(pos_get_variable ram --from-loop)
+        ram=$(loopvar ram)
         # occupy unwanted ram
         availram=$(free -m | grep "Mem:" | awk '{print $7}')
         fallocate -l $((availram-ram))M /whale/size
@@ -34,7 +34,7 @@ limitRAM() {
 setQuota() {
 
     # set up dynamic cgroup via systemd
-    quota=$(pos_get_variable quotas --from-loop)
+    quota=$(loopvar quotas)
     environ+=" systemd-run --scope -p CPUQuota=${quota}%"    
     return 0
 }
@@ -47,7 +47,7 @@ limitBandwidth() {
     # skip when code 7 -> do not manipulate any link
     [ "$nodemanipulate" -eq 7 ] && return 0
 
-    bandwidth=$(pos_get_variable bandwidths --from-loop)
+    bandwidth=$(loopvar bandwidths)
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
     NIC1=$(pos_get_variable "$(hostname)"NIC1 --from-global) || NIC1=0
     NIC2=$(pos_get_variable "$(hostname)"NIC2 --from-global) || NIC2=0
@@ -90,7 +90,7 @@ setLatency() {
     # skip when code 7 -> do not manipulate any link
     [ "$nodemanipulate" -eq 7 ] && return 0
 
-    latency=$(pos_get_variable latencies --from-loop)
+    latency=$(loopvar latencies)
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
     NIC1=$(pos_get_variable "$(hostname)"NIC1 --from-global) || NIC1=0
     NIC2=$(pos_get_variable "$(hostname)"NIC2 --from-global) || NIC2=0
@@ -127,7 +127,7 @@ setLatency() {
 
 setPacketdrop() {
 
-    packetdrop=$(pos_get_variable packetdrops --from-loop)
+    packetdrop=$(loopvar packetdrops)
     # check if switch topology (bc in this case only 1 interface pro host)
     # for 3 interconnected hosts topologies
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
@@ -143,15 +143,15 @@ setFrequency() {
 
     # manipulate frequency last
     # verify on host with watch cat /sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq
-    cpu_freq=$(pos_get_variable freqs --from-loop)
+    cpu_freq=$(loopvar freqs)
     cpupower frequency-set -f "$cpu_freq"GHz
     return 0
 }
 
 setLatencyBandwidth() {
 
-    latency=$(pos_get_variable latencies --from-loop)
-    bandwidth=$(pos_get_variable bandwidths --from-loop)
+    latency=$(loopvar latencies)
+    bandwidth=$(loopvar bandwidths)
 
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
     NIC1=$(pos_get_variable "$(hostname)"NIC1 --from-global) || NIC1=0
@@ -166,8 +166,8 @@ setLatencyBandwidth() {
 }
 
 setBandwidthPacketdrop() {
-    bandwidth=$(pos_get_variable bandwidths --from-loop)
-    packetdrop=$(pos_get_variable packetdrops --from-loop)
+    bandwidth=$(loopvar bandwidths)
+    packetdrop=$(loopvar packetdrops)
 
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
     NIC1=$(pos_get_variable "$(hostname)"NIC1 --from-global) || NIC1=0
@@ -185,8 +185,8 @@ setBandwidthPacketdrop() {
 }
 
 setPacketdropLatency() {
-    packetdrop=$(pos_get_variable packetdrops --from-loop)
-    latency=$(pos_get_variable latencies --from-loop)
+    packetdrop=$(loopvar packetdrops)
+    latency=$(loopvar latencies)
 
     NIC0=$(pos_get_variable "$(hostname)"NIC0 --from-global)
     NIC1=$(pos_get_variable "$(hostname)"NIC1 --from-global) || NIC1=0
@@ -14,19 +14,36 @@ set -x
 REPO_DIR=$(pos_get_variable repo_dir --from-global)
 REPO2_DIR=$(pos_get_variable repo2_dir --from-global)
 manipulate=$(pos_get_variable manipulate --from-global)
+sampleinterval=$(pos_get_variable sampleinterval --from-global)
+binarycache=$(pos_get_variable binarycache --from-global)
+# planned runs hold all loop variables of an iteration in the plan variable, see helpers/loop_planner.py
+plan=$(pos_get_variable plan --from-loop) || plan=""
+loopvar() {
+    if [ -n "$plan" ]; then
+        tr ';' '\n' <<< "$plan" | grep "^$1=" | cut -d '=' -f 2-
+    else
+        pos_get_variable "$1" --from-loop
+    fi
+}
+# manipulations applied by the previous planned iteration, and the ones to keep for the next one
+reuse=$(loopvar reuse) || reuse=""
+keep=$(loopvar keep) || keep=""
+planned() {
+    [[ ",$2," == *",$1,"* ]]
+}
 # load loop variables/switches
-size=$(pos_get_variable input_size --from-loop)
-protocol=$(pos_get_variable protocol --from-loop)
-datatype=$(pos_get_variable datatype --from-loop)
-preprocess=$(pos_get_variable preprocess --from-loop)
-splitroles=$(pos_get_variable splitroles --from-loop)
-packbool=$(pos_get_variable packbool --from-loop)
-optshare=$(pos_get_variable optshare --from-loop)
-ssl=$(pos_get_variable ssl --from-loop)
-threads=$(pos_get_variable threads --from-loop)
-fun=$(pos_get_variable function --from-loop)
-txbuffer=$(pos_get_variable txbuffer --from-loop)
-rxbuffer=$(pos_get_variable rxbuffer --from-loop)
+size=$(loopvar input_size)
+protocol=$(loopvar protocol)
+datatype=$(loopvar datatype)
+preprocess=$(loopvar preprocess)
+splitroles=$(loopvar splitroles)
+packbool=$(loopvar packbool)
+optshare=$(loopvar optshare)
+ssl=$(loopvar ssl)
+threads=$(loopvar threads)
+fun=$(loopvar function)
+txbuffer=$(loopvar txbuffer)
+rxbuffer=$(loopvar rxbuffer)
 
 timerf="%M (Maximum resident set size in kbytes)\n\
 %e (Elapsed wall clock time in seconds)\n\
@@ -57,25 +74,37 @@ else
     ipD="$network".5
 fi
 
+# compile flags, the cache key of the binaries
+flags=( -n "$size" -d "$datatype" -s "$protocol" -e "$preprocess" -c "$packbool" -o "$optshare" -h "$ssl" -b 25000 \
+    -j "$threads" -f "$fun" -y "$txbuffer" -z "$rxbuffer" )
+# with splitroles active, "-p 3" would through error. Omit -p as unneeded
+[ "$splitroles" -eq 0 ] && flags=( -p "$player" "${flags[@]}" )
+splitflags=( -p "$player" -a "$ipA" -b "$ipB" )
+[ "$splitroles" -gt 1 ] && splitflags+=( -c "$ipC" -d "$ipD" )
+
+# shellcheck source=../host_scripts/binary_cache.sh
+source "$REPO2_DIR"/host_scripts/binary_cache.sh
+cachekey=$(getCacheKey "${flags[@]}" split "$splitroles" "${splitflags[@]}")
+
 {
     echo "./Scripts/config.sh -p $player -n $size -d $datatype -s $protocol -e $preprocess -h $ssl"
 
-    # set config and compile experiment
-    if [ "$splitroles" -eq 0 ]; then
-        /bin/time -f "$timerf" ./Scripts/config.sh -p "$player" -n "$size" -d "$datatype" \
-            -s "$protocol" -e "$preprocess" -c "$packbool" -o "$optshare" -h "$ssl" -b 25000 \
-            -j "$threads" -f "$fun" -y "$txbuffer" -z "$rxbuffer"
+    # reuse the binaries of an earlier iteration with the same flags, the restore
+    # is timed instead of the compile step
+    if [ "$binarycache" -gt 0 ] && restoreBinaries "$cachekey"; then
+        echo "Binary cache hit $cachekey"
     else
-        # with splitroles active, "-p 3" would through error. Omit -p as unneeded
-        /bin/time -f "$timerf" ./Scripts/config.sh -n "$size" -d "$datatype" \
-            -s "$protocol" -e "$preprocess" -c "$packbool" -o "$optshare" -h "$ssl" -b 25000 \
-            -j "$threads" -f "$fun" -y "$txbuffer" -z "$rxbuffer"
+        rm -f search-P*
+        # set config and compile experiment
+        /bin/time -f "$timerf" ./Scripts/config.sh "${flags[@]}"
+
+        [ "$splitroles" -eq 1 ] && ./Scripts/split-roles-3-compile.sh "${splitflags[@]}"
+        [ "$splitroles" -eq 2 ] && ./Scripts/split-roles-3to4-compile.sh "${splitflags[@]}"
+        [ "$splitroles" -eq 3 ] && ./Scripts/split-roles-4-compile.sh "${splitflags[@]}"
+
+        [ "$binarycache" -gt 0 ] && storeBinaries "$cachekey" "$binarycache"
     fi
     
-    [ "$splitroles" -eq 1 ] && ./Scripts/split-roles-3-compile.sh -p "$player" -a "$ipA" -b "$ipB"
-    [ "$splitroles" -eq 2 ] && ./Scripts/split-roles-3to4-compile.sh -p "$player" -a "$ipA" -b "$ipB" -c "$ipC" -d "$ipD"
-    [ "$splitroles" -eq 3 ] && ./Scripts/split-roles-4-compile.sh -p "$player" -a "$ipA" -b "$ipB" -c "$ipC" -d "$ipD"
-    
     echo "$(du -BM search-P* | cut -d 'M' -f 1 | head -n 1) (Binary file size in MiB)"
 
 } |& tee testresults
@@ -90,13 +119,13 @@ source "$REPO2_DIR"/host_scripts/manipulate.sh
 
 case " ${types[*]} " in
     *" CPUS "*)
-        limitCPUs;;&
+        planned cpus "$reuse" || limitCPUs;;&
     *" RAM "*)
-        limitRAM;;&
+        planned ram "$reuse" || limitRAM;;&
     *" QUOTAS "*)
         setQuota;;&
     *" FREQS "*)
-        setFrequency;;&
+        planned freqs "$reuse" || setFrequency;;&
     *" BANDWIDTHS "*)
         # check whether to manipulate a combination
         case " ${types[*]} " in
@@ -125,6 +154,13 @@ success=true
 
 pos_sync --timeout 300
 
+# sample cpu, memory and network usage during the protocol run, interval 0 disables the sampler
+samplerpid=""
+if [ "$sampleinterval" != 0 ]; then
+    python3 "$REPO2_DIR"/host_scripts/resource_sampler.py resources -i "$sampleinterval" &
+    samplerpid=$!
+fi
+
 # run the SMC protocol
                               # skip 4th node here
 if [ "$splitroles" -eq 0 ] && [ "$player" -lt 3 ]; then
@@ -138,40 +174,28 @@ elif [ "$splitroles" -eq 3 ]; then
     /bin/time -f "$timerf" timeout 420s ./Scripts/split-roles-4-execute.sh -p "$player" -a "$ipA" -b "$ipB" -c "$ipC" -d "$ipD" &>> testresults || success=false
 fi
 
+if [ -n "$samplerpid" ]; then
+    kill "$samplerpid" || true
+    wait "$samplerpid" || true
+fi
+
 # divide external runtime x*j
 # Todo: divide normal binary run by j*j
 
 # do calculations if splitroles is active or more threads are used
 if [ "$splitroles" -gt 0 ] || [ "$threads" -gt 1 ]; then
 
-    # binary:   calculate mean of j results running concurrent ( /j *j )
-    # 3nodes:   calculate mean of 6*j results running concurrent ( /6*j *6*j )
-    # 3-4nodes: calculate mean of 18*j results running concurrent ( /18*j *18*j )
-    # 4nodes:   calculate mean of 24*j results running concurrent ( /24*j *24*j )
-    [ "$splitroles" -eq 0 ] && divisor=$((threads*threads)) && divisorExt=$((threads))
-    [ "$splitroles" -eq 1 ] && divisor=$((6*6*threads*threads)) && divisorExt=$((6*threads))
-    [ "$splitroles" -eq 2 ] && divisor=$((18*18*threads*threads)) && divisorExt=$((18*threads))
-    [ "$splitroles" -eq 3 ] && divisor=$((24*24*threads*threads)) && divisorExt=$((24*threads))
-
-    sum=$(grep "measured to initialize program" testresults | cut -d 's' -f 2 | awk '{print $5}' | paste -s -d+ | bc)
-    average=$(echo "scale=6;$sum / $divisor" | bc -l)
-    echo "Time measured to initialize program: ${average}s" &>> testresults
-
-    sum=$(grep "computation clock" testresults | cut -d 's' -f 2 | awk '{print $6}' | paste -s -d+ | bc)
-    average=$(echo "scale=6;$sum / $divisor" | bc -l)
-    echo "Time measured to perform computation clock: ${average}s" &>> testresults
-
-    sum=$(grep "computation getTime" testresults | cut -d 's' -f 2 | awk '{print $6}' | paste -s -d+ | bc)
-    average=$(echo "scale=6;$sum / $divisor" | bc -l)
-    echo "Time measured to perform computation getTime: ${average}s" &>> testresults
-
-    sum=$(grep "computation chrono" testresults | cut -d 's' -f 2 | awk '{print $6}' | paste -s -d+ | bc)
-    average=$(echo "scale=6;$sum / $divisor" | bc -l)
-    echo "Time measured to perform computation chrono: ${average}s" &>> testresults
+    # binary:   mean of j results running concurrent, divided by j
+    # 3nodes:   mean of 6*j results running concurrent, divided by 6*j
+    # 3-4nodes: mean of 18*j results running concurrent, divided by 18*j
+    # 4nodes:   mean of 24*j results running concurrent, divided by 24*j
+    [ "$splitroles" -eq 0 ] && divisorExt=$((threads))
+    [ "$splitroles" -eq 1 ] && divisorExt=$((6*threads))
+    [ "$splitroles" -eq 2 ] && divisorExt=$((18*threads))
+    [ "$splitroles" -eq 3 ] && divisorExt=$((24*threads))
 
-    runtimeext=$(grep "Elapsed wall clock" testresults | tail -n 1 | cut -d ' ' -f 1)
-    average=$(echo "scale=6;$runtimeext / $divisorExt" | bc -l)
-    echo "$average (Elapsed wall clock time in seconds)" &>> testresults
+    # append the averaged times and the min/p50/p90/p99/max/mean distribution of all instances per phase
+    python3 "$REPO2_DIR"/host_scripts/instance_timings.py testresults "$divisorExt"
 
 fi
 
@@ -184,13 +208,13 @@ pos_sync
 case " ${types[*]} " in
 
     *" FREQS "*)
-        resetFrequency;;&
+        planned freqs "$keep" || resetFrequency;;&
     *" RAM "*)
-        unlimitRAM;;&
+        planned ram "$keep" || unlimitRAM;;&
     *" BANDWIDTHS "*|*" LATENCIES "*|*" PACKETDROPS "*)
     	resetTrafficControl;;&
     *" CPUS "*)
-        unlimitCPUs
+        planned cpus "$keep" || unlimitCPUs
 esac
 
 ####
@@ -200,5 +224,6 @@ esac
 echo "experiment finished"  >> testresults
 pos_upload --loop testresults
 pos_upload --loop terminal_output.txt
+[ -f resources ] && pos_upload --loop resources
 # abort if no success
 $success
\ No newline at end of file
@@ -0,0 +1,125 @@
+#! /usr/bin/python3
+
+# Resource sampler started by measurement.sh around the protocol execution. Samples the per-core
+# utilization from /proc/stat, the summed resident memory of the protocol binaries from
+# /proc/<pid>/status and the NIC byte counters from /proc/net/dev until it is terminated.
+#
+# Binary format, little endian:
+#   header: magic "SVRS", version (uint8), cores (uint16), interval in s (float32)
+#   record: time since start in s (float32), RSS in KiB (uint32), rx bytes (uint64), tx bytes (uint64),
+#           utilization of every core in % (uint8 each) since the previous record
+
+import argparse
+import os
+import signal
+import struct
+import time
+
+magic = b"SVRS"
+version = 1
+header_format = "<4sBHf"
+record_format = "<fIQQ"
+
+
+def read_cpus():
+    """
+    :return: busy and total jiffies per core
+    """
+    cpus = []
+    with open("/proc/stat") as f:
+        for line in f:
+            if not line.startswith("cpu"):
+                break
+            if line.startswith("cpu "):
+                continue
+            # user nice system idle iowait irq softirq steal
+            values = [int(value) for value in line.split()[1:9]]
+            cpus.append((sum(values) - values[3] - values[4], sum(values)))
+    return cpus
+
+
+def read_rss(binary):
+    # split roles run several instances of the binary, their memory is summed
+    rss = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open("/proc/" + pid + "/status") as f:
+                status = f.read()
+        except OSError:
+            continue
+        if not status.startswith("Name:\t" + binary):
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                rss += int(line.split()[1])
+                break
+    return rss
+
+
+def read_net():
+    # bytes of all interfaces but loopback
+    rx = tx = 0
+    with open("/proc/net/dev") as f:
+        for line in f.readlines()[2:]:
+            name, values = line.split(":", 1)
+            if name.strip() == "lo":
+                continue
+            values = values.split()
+            rx += int(values[0])
+            tx += int(values[8])
+    return rx, tx
+
+
+def read_samples(path):
+    """
+    :return: interval and list of records (time, rss KiB, rx bytes, tx bytes, tuple of core utilizations)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    size = struct.calcsize(header_format)
+    if len(data) < size or data[:4] != magic:
+        return None, []
+    _, _, cores, interval = struct.unpack_from(header_format, data)
+    record = struct.Struct(record_format + str(cores) + "B")
+    samples = []
+    for offset in range(size, len(data) - record.size + 1, record.size):
+        values = record.unpack_from(data, offset)
+        samples.append(values[:4] + (values[4:],))
+    return interval, samples
+
+
+def sample(path, interval, binary):
+    stop = []
+    signal.signal(signal.SIGTERM, lambda *_: stop.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stop.append(True))
+
+    previous = read_cpus()
+    record = struct.Struct(record_format + str(len(previous)) + "B")
+    start = time.monotonic()
+    with open(path, "wb") as f:
+        f.write(struct.pack(header_format, magic, version, len(previous), interval))
+        while not stop:
+            # sleep to the next tick, sampling does not drift with the time it takes
+            time.sleep(max(interval - (time.monotonic() - start) % interval, 0))
+            current = read_cpus()
+            utilization = [round(100 * (busy - busy0) / (total - total0)) if total > total0 else 0
+                           for (busy, total), (busy0, total0) in zip(current, previous)]
+            previous = current
+            rx, tx = read_net()
+            f.write(record.pack(time.monotonic() - start, read_rss(binary), rx, tx, *utilization))
+            f.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Samples CPU, memory and network usage into a binary time series until terminated.')
+    parser.add_argument('output', type=str, help='Required, path of the time series file.')
+    parser.add_argument('-i', '--interval', type=float, default=0.1, help='(Optional) interval in s (default: 0.1)')
+    parser.add_argument('-b', '--binary', type=str, default="search-P",
+                        help='(Optional) process name prefix of the protocol binaries (default: search-P)')
+
+    args = parser.parse_args()
+
+    sample(args.output, args.interval, args.binary)
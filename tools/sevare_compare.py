@@ -0,0 +1,180 @@
+# Performance comparison of two sevarebench result folders of the same configs, like before and after
+# an MP-Slice commit bump. Rows are matched on protocol, switches and all measured variables, repetitions
+# of a point are compared with Welch's t-test.
+
+import argparse
+import json
+import math
+import sys
+
+from sevare_parser import Accumulator, find_table, load_table, switches_names, t_quantiles, variable_array
+
+
+def t_quantile(degrees):
+    # two-sided 95% quantile, the table rounds fractional degrees of freedom down
+    if degrees < 1:
+        return math.inf
+    # repetitions without variance have infinite degrees of freedom, the normal quantile
+    if not math.isfinite(degrees):
+        return 1.960
+    degrees = int(degrees)
+    return t_quantiles[degrees - 1] if degrees <= len(t_quantiles) else 1.960
+
+
+def load_points(data_dir, key_columns, metric):
+    """
+    :return: dict point key -> Accumulator of the metric over the repetitions
+    """
+    table = find_table(data_dir)
+    header, columns, nrows, _ = load_table(table)
+    if metric not in columns:
+        print("Column " + metric + " not found in " + table)
+        sys.exit(1)
+    points = {}
+    for r in range(nrows):
+        key = tuple(columns[name][r] for name in key_columns)
+        points.setdefault(key, Accumulator()).add(columns[metric][r])
+    return points
+
+
+def get_key_columns(base_dir, new_dir):
+    headers = []
+    for data_dir in (base_dir, new_dir):
+        table = find_table(data_dir)
+        if table is None:
+            print("Could not find a csv file with 'full' or 'short' in the name in " + data_dir)
+            sys.exit(1)
+        with open(table) as f:
+            headers.append(f.readline().rstrip("\n").split(';'))
+    # protocol first, the ranked report reads best with it
+    names = ["protocol"] + switches_names + variable_array
+    return [name for name in names if name in headers[0] and name in headers[1]]
+
+
+def welch(base, new):
+    """
+    :return: t statistic and degrees of freedom of new vs base, None if a side has no repetitions
+    """
+    if base.n < 2 or new.n < 2:
+        return None
+    variance_base = base.m2 / (base.n - 1) / base.n
+    variance_new = new.m2 / (new.n - 1) / new.n
+    se = math.sqrt(variance_base + variance_new)
+    if se == 0:
+        return (0.0 if new.mean == base.mean else math.copysign(math.inf, new.mean - base.mean)), math.inf
+    degrees = (variance_base + variance_new) ** 2 / (
+        variance_base ** 2 / (base.n - 1) + variance_new ** 2 / (new.n - 1))
+    return (new.mean - base.mean) / se, degrees
+
+
+def compare_points(base_points, new_points, key_columns):
+    """
+    :return: list of per-point comparisons, points measured in only one folder are left out
+    """
+    points = []
+    for key, base in base_points.items():
+        new = new_points.get(key)
+        if new is None or base.n == 0 or new.n == 0 or base.mean <= 0 or new.mean <= 0:
+            continue
+        test = welch(base, new)
+        significant = None if test is None else abs(test[0]) > t_quantile(test[1])
+        points.append({
+            "point": dict(zip(key_columns, key)),
+            "base_mean": base.mean, "base_n": base.n,
+            "new_mean": new.mean, "new_n": new.n,
+            # > 1 faster, < 1 slower, for times and other lower is better metrics
+            "speedup": base.mean / new.mean,
+            # constant repetitions give infinite t, not representable in JSON
+            "t": None if test is None or math.isinf(test[0]) else test[0],
+            "significant": significant,
+        })
+    return points
+
+
+def compare_protocols(points):
+    """
+    :return: per protocol geometric mean speedup, tested with a one-sample t-test on the log speedups of its points
+    """
+    logs = {}
+    for point in points:
+        logs.setdefault(point["point"]["protocol"], Accumulator()).add(math.log(point["speedup"]))
+    protocols = {}
+    for protocol, accumulator in sorted(logs.items()):
+        mean, _, stddev = accumulator.stats()[:3]
+        significant = None
+        if accumulator.n > 1:
+            se = stddev / math.sqrt(accumulator.n)
+            significant = mean != 0 if se == 0 else abs(mean / se) > t_quantile(accumulator.n - 1)
+        matching = [point for point in points if point["point"]["protocol"] == protocol]
+        protocols[protocol] = {
+            "speedup": math.exp(mean),
+            "points": accumulator.n,
+            "significant": significant,
+            "faster": sum(1 for point in matching if point["significant"] and point["speedup"] > 1),
+            "slower": sum(1 for point in matching if point["significant"] and point["speedup"] < 1),
+        }
+    return protocols
+
+
+def format_significance(significant):
+    return {True: "*", False: " ", None: "?"}[significant]
+
+
+def print_report(points, protocols, key_columns, top):
+    print("Protocols (geometric mean speedup new vs base, * significant at 95%, ? too few repetitions):")
+    for protocol, result in sorted(protocols.items(), key=lambda item: item[1]["speedup"]):
+        print("  protocol {:>3} {:8.3f}x {} over {:5d} points, {} significantly faster, {} slower".format(
+            protocol, result["speedup"], format_significance(result["significant"]), result["points"],
+            result["faster"], result["slower"]))
+
+    # point columns that differ between the points, the others are the same for the whole run
+    varying = [name for name in key_columns if len(set(point["point"][name] for point in points)) > 1]
+    print("\nLargest regressions:")
+    print("  speedup   base_mean   new_mean  " + "  ".join(varying))
+    for point in sorted(points, key=lambda point: point["speedup"])[:top]:
+        print("  {:6.3f}x{} {:10.4g} {:10.4g}  ".format(point["speedup"], format_significance(point["significant"]),
+                                                        point["base_mean"], point["new_mean"]) +
+              "  ".join(point["point"][name] for name in varying))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Compares the measurements of two sevarebench result folders of the same configs.')
+    parser.add_argument('base_dir', type=str, help='Required, testresults dir of the baseline run.')
+    parser.add_argument('new_dir', type=str, help='Required, testresults dir of the run to compare.')
+    parser.add_argument('-m', '--metric', type=str, default="runtime_chrono(s)",
+                        help='(Optional) lower is better column to compare (default: runtime_chrono(s))')
+    parser.add_argument('-o', '--output', type=str, help='(Optional) write the comparison as JSON to <file>')
+    parser.add_argument('-n', '--top', type=int, default=20, help='(Optional) number of points in the report')
+    parser.add_argument('--fail-below', type=float,
+                        help='(Optional) exit with code 3 if a protocol is significantly slower than <speedup>, '
+                             'like 0.95 for a 5%% regression')
+
+    args = parser.parse_args()
+
+    base_dir, new_dir = [d if d.endswith('/') else d + '/' for d in (args.base_dir, args.new_dir)]
+
+    key_columns = get_key_columns(base_dir, new_dir)
+    base_points = load_points(base_dir, key_columns, args.metric)
+    new_points = load_points(new_dir, key_columns, args.metric)
+    points = compare_points(base_points, new_points, key_columns)
+    if not points:
+        print("No matching points between the two runs")
+        sys.exit(1)
+    protocols = compare_protocols(points)
+    print("Matched " + str(len(points)) + " of " + str(len(base_points)) + " base and " + str(len(new_points)) +
+          " new points on " + ", ".join(key_columns) + "\n")
+    print_report(points, protocols, key_columns, args.top)
+
+    regressions = [protocol for protocol, result in protocols.items()
+                   if args.fail_below is not None and result["significant"] and result["speedup"] < args.fail_below]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"base": base_dir, "new": new_dir, "metric": args.metric, "key": key_columns,
+                       "fail_below": args.fail_below, "regressions": regressions, "protocols": protocols,
+                       "points": sorted(points, key=lambda point: point["speedup"])}, f, indent=1)
+
+    if regressions:
+        print("\nSignificant regression below " + str(args.fail_below) + "x of protocols " + " ".join(regressions))
+        sys.exit(3)
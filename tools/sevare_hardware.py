@@ -0,0 +1,7 @@
+# Hardware of the testbed nodes, shared by the plotter, the results store and the config scheduler.
+# Add new testbed hosts here.
+
+nodehardware = {}
+nodehardware.update({node: "Intel D-1518(2.2GHz) 32GiB 1Gbits" for node in ["dogecoin", "bitcoin", "ether", "todd", "rod", "ned"]})
+nodehardware.update({node: "AMD 7543(2.8GHz) 512GiB 25Gbits" for node in ["algofi", "gard", "goracle", "zone"]})
+nodehardware.update({node: "Intel 6312U(2.4GHz) 512GiB 25Gbits" for node in ["idex", "meld", "yieldly", "tinyman"]})
@@ -1,9 +1,16 @@
-# Original Author Philipp Eisermann 
+# Original Author Philipp Eisermann
 # Original Source https://github.com/Philipp-Eisermann/sevareparser
 # Adapted version
 
 import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import math
 import os
+import shutil
+import statistics
 
 # custom imports
 import re
@@ -16,211 +23,515 @@ import subprocess
 # program;c.domain;adv.model;protocol;partysize;comp.time(s);comp.peakRAM(MiB);bin.filesize(MiB);input_size;runtime_internal(s);runtime_external(s);peakRAM(MiB);jobCPU(%);P0commRounds;P0dataSent(MB);ALLdataSent(MB)
 #   0         1       2         3         4          5               6                7            8 + n        9 + n                  10 + n          11 + n      12 + n     13 + n
 
-# REQUIREMENTS:
-# - The table MUST NOT contain lines with equal values of the variable array (see variable_array) - this only happens
-# if the protocol was run multiple times for same parameter values in the same run
-
-
-# ----- ARGUMENTS --------
-parser = argparse.ArgumentParser(
-    description='This program parses the measurement folder outputted by sevareslice (version from 03/23).')
-
-parser.add_argument('data_dir', type=str, help='Required, testresults dir to parse.')
-parser.add_argument('-s', type=str, help='(Optional) Sort table by <parameter> (3D parsing)')
-parser.add_argument('-f', "--force", action="store_true", help='(Optional) Force overwrite')
-
-args = parser.parse_args()
-
-data_dir = args.data_dir
-
-if data_dir[len(args.data_dir)-1] != '/':
-    data_dir += '/'
-
-# ------- PARSING ---------
-
-# Open datatable
-data_table = None
-for file in sorted(os.listdir(data_dir + 'data/')):
-    if file.endswith(".csv") and ("full" in file or "short" in file):
-        print("Found results table...")
-        data_table = file
-        break
-
-if data_table is None:
-    print("Could not find a csv file with 'full' or 'short' in the name.")
-    exit()
-
-data_table = open(data_dir + 'data/' + data_table)
-
-if os.path.exists(data_dir + "parsed"):
-    if not args.force:
-        print("Error, \"parsed\"-folder exits. Run parser with -f to force overwriting")
-        exit()
-
-    subprocess.run(["rm", "-rf", data_dir + "parsed"])
-
-os.mkdir(data_dir + "parsed")
-
-
-#runtimes_file_2D = open(data_dir + "parsed/runtimes2D.txt", "a")
-#info_file = open(data_dir + "parsed/protocol_infos.txt", "a")
-
-header = data_table.readline().split(';')
-
-runtime_index = -1
-protocol_index = -1
-sorting_index = -1
-
-comm_rounds_index = -1
-data_sent_index = -1
+# Repetitions:
+# - Lines with equal values of the variable array (see variable_array), when the protocol was run multiple times
+# for same parameter values, are aggregated into one point per x value. Format of the 2D files:
+# x;mean;median;stddev;min;max;ci95 (tab separated, ci95 is the half width of the 95% confidence interval)
+# followed by the same six columns for every derived metric in the order of metric_names
+# 3D files hold a dense grid of two manipulated variables in the same format as x;y;mean;...;ci95, one scanline
+# per y value separated by empty lines, nan where a grid point was not measured
 
 # datatype and inputsize must stay at position [0] and [-1] to work, add new vars inbetween
 variable_array = ["datatype", "threads", "txbuffer", "rxbuffer"] # Adaptions
 variable_array += ["latencies(ms)", "bandwidths(Mbs)", "packetdrops(%)", "freqs(GHz)", "quotas(%)", "cpus", "input_size"]  # Names from the table!
 var_name_array = ["Dtp_", "Thd_", "txB_", "rxB_"] # Adaptions
 var_name_array += ["Lat_", "Bwd_", "Pdr_", "Frq_", "Quo_", "Cpu_", "Inp_"]  # INDICES HAVE TO MATCH ABOVE ARRAY
-var_val_array = [None] * len(variable_array)  # used to store changing variables
-index_array = [-1] * len(variable_array)
-datafile_array = [None] * len(variable_array)
+
+# variables plotted for every datatype instead of only the highest one, input size and the scaling variables
+per_datatype = ["threads", "cpus", "input_size"]
+
+# Names of the configured values in the run summary, used to find the variables swept in a run
+summary_names = {"Threads": "threads", "txBuffer": "txbuffer", "rxBuffer": "rxbuffer", "LATENCIES": "latencies(ms)",
+                 "BANDWIDTHS": "bandwidths(Mbs)", "PACKETDROPS": "packetdrops(%)", "FREQS": "freqs(GHz)",
+                 "QUOTAS": "quotas(%)", "CPUS": "cpus", "Inputs": "input_size"}
 
 # Adaption
 # switches are on/off values, where a feature is either off or on
 # e -> preprocess; r -> splitroles; c -> packbool; o -> optimize sharing; h -> ssl; f -> function;
 switches_names = ["preprocess", "splitroles", "packbool", "optshare", "ssl", "function"]
-switch_indexes = [-1] * len(switches_names)
-
-# Get indexes of present columns
-for i in range(len(header)):
-    # Indexes of variables
-    for j in range(len(index_array)):
-        if header[i] == variable_array[j]:
-            index_array[j] = i
-    
-     # Adaptions: Indexes of switches
-    for j in range(len(switch_indexes)):
-        if header[i] == switches_names[j]:
-            switch_indexes[j] = i
-
-    if header[i] == "runtime_chrono(s)":  # Name from the table
-        runtime_index = i
-    elif header[i] == "protocol":  # Name from the table
-        protocol_index = i
-    # Sorting index
-    elif header[i] == args.s:
-        sorting_index = i
-    # Metrics indexes
-    elif header[i] == "P0dataSent(MB)":
-        comm_rounds_index = i
-    elif header[i] == "ALLdataSent(MB)":  # "P0dataSent(MB)"
-        data_sent_index = i
-
-if not os.path.exists(data_dir + "parsed/2D"):
-    os.mkdir(data_dir + "parsed/2D")
-
-#if not os.path.exists(data_dir + "parsed/3D"):
-#    os.mkdir(data_dir + "parsed/3D")
-
-# Create array of dataset
-protocol = ""
-protocols = []
-comm_rounds_array = []
-data_sent_array = []
-
-previous = ""
-
-dataset_array = []
-for row in data_table.readlines():
-    dataset_array.append(row.split(';'))
-
-# Needs to be sorted by protocol, MPSlice exporting order is different
-dataset_array = sorted(dataset_array, key=lambda x: x[protocol_index])
-## debug
-##for row in dataset_array:
-##    print(" ".join("{:4}".format(col) for col in row), end = " ")
-
-# get highest input value from summary
-maxinput = -1
-maxdtype = -1
-with open(glob.glob(data_dir + "E*-run-summary.dat")[0], "r") as f:
-    for line in f:
-        match = re.search(r"Inputs.*", line)
-        if match:
-            numbers = [int(x) for x in re.findall(r'\b\d+\b', match.group(0))]
-            maxinput = max(numbers)
-        match = re.search(r"Datatypes.*", line)
-        if match:
-            numbers = [int(x) for x in re.findall(r'\b\d+\b', match.group(0))]
-            maxdtype = max(numbers)    
-
-# - - - - - - - Parsing for 2D plots - - - - - - - -
-# Go through dataset for each variable
-print(index_array)
-for i in range(len(index_array)):
+switches_short = ["pre", "split", "pack", "opt", "ssl", "fun"]  # as used in the plot file names
+switches_defaults = ["0", "0", "0", "1", "1", "0"]  # default values in case the table is lacking them
+
+# measured and derived metrics of every row, each one written as six columns of statistics
+# elements -> input_size, bits -> input_size * datatype, CPU seconds -> jobCPU(%) of runtime_external(s)
+# overhead -> runtime_external(s) not spent in the init, preprocessing and online (runtime_chrono) phases
+metric_names = ["runtime_chrono(s)", "elements/s", "bits/s", "P0MB/element", "ALLMB/element", "CPUs/element",
+                "inittime(s)", "preproc(s)", "overhead(s)", "peakRAM(MiB)", "comp.time(s)", "comp.peakRAM(MiB)"]
+# distribution of the times of the concurrent instances in split role and multi-threaded runs
+instance_names = [phase + "_" + stat + "(s)" for phase in ["init", "chrono"] for stat in ["min", "p50", "p90", "p99", "max", "mean"]]
+metric_names += instance_names
+# summary of the resource samples taken during the protocol run
+sampled_names = ["cpuUtil(%)", "coreUtilMax(%)", "sampledRSS(MiB)", "txRate(Mbs)", "txRateMax(Mbs)", "rxRate(Mbs)"]
+metric_names += sampled_names
+
+# two-sided 95% student t quantiles for 1..30 degrees of freedom, normal quantile above
+t_quantiles = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145,
+               2.131, 2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048,
+               2.045, 2.042]
+
+
+class Accumulator:
+    """
+    One-pass (Welford) statistics of the repetitions of one measurement point, the median is exact up to 15
+    repetitions and a P² estimate above, so the state stays bounded for the checkpoint
+    """
+    # repetitions kept for the exact median
+    exact = 15
+    __slots__ = ["n", "mean", "m2", "min", "max", "heights", "positions"]
+    # increments of the desired P² marker positions, for the minimum, the quartiles, the median and the maximum
+    increments = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+    def __init__(self, state=None):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = math.inf, -math.inf
+        # sorted values up to the exact repetitions, marker heights above
+        self.heights = []
+        self.positions = []
+        if state:
+            self.n, self.mean, self.m2, self.min, self.max, self.heights, self.positions = state
+
+    def state(self):
+        # compact list for the checkpoint, empty for metrics the table lacks
+        return [self.n, self.mean, self.m2, self.min, self.max, self.heights, self.positions] if self.n else []
+
+    def add(self, value):
+        try:
+            value = float(value)
+        except ValueError:
+            # measurements missing in the table (NA)
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if self.n <= self.exact:
+            bisect.insort(self.heights, value)
+            return
+        if self.n == self.exact + 1:
+            # markers at the quartiles of the kept values
+            self.positions = [round(1 + (self.exact - 1) * increment) for increment in self.increments]
+            self.heights = [self.heights[position - 1] for position in self.positions]
+        self.add_marker(value)
+
+    def add_marker(self, value):
+        q, positions = self.heights, self.positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = bisect.bisect_right(q, value) - 1
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        # adjust the inner markers towards their desired positions
+        shift = self.n - 1
+        for i in (1, 2, 3):
+            d = 1 + shift * self.increments[i] - positions[i]
+            if -1 < d < 1:
+                continue
+            d = 1 if d > 0 else -1
+            if positions[i + d] - positions[i] != d:
+                # piecewise parabolic prediction, linear if it breaks the order of the markers
+                height = q[i] + d / (positions[i + 1] - positions[i - 1]) * (
+                    (positions[i] - positions[i - 1] + d) * (q[i + 1] - q[i]) / (positions[i + 1] - positions[i]) +
+                    (positions[i + 1] - positions[i] - d) * (q[i] - q[i - 1]) / (positions[i] - positions[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (positions[i + d] - positions[i])
+                q[i] = height
+                positions[i] += d
+
+    def median(self):
+        return statistics.median(self.heights) if self.n <= self.exact else self.heights[2]
+
+    def stats(self):
+        """
+        :return: mean, median, stddev, min, max, ci95 half width
+        """
+        if self.n == 0:
+            return [math.nan] * 6
+        degrees = self.n - 1
+        stddev = math.sqrt(self.m2 / degrees) if degrees > 0 else 0.0
+        t = t_quantiles[min(degrees, len(t_quantiles)) - 1] if degrees > 0 else 0.0
+        t = t if degrees <= len(t_quantiles) else 1.960
+        return [self.mean, self.median(), stddev, self.min, self.max, t * stddev / math.sqrt(self.n)]
+
+
+def find_table(data_dir):
+    for file in sorted(os.listdir(data_dir + 'data/')):
+        if file.endswith(".csv") and ("full" in file or "short" in file):
+            return data_dir + 'data/' + file
+    return None
+
+
+def load_table(path, offset=0):
+    """
+    Reads the table once into columns of raw strings
+    :param offset: byte offset of the first row to read, 0 reads all rows
+    :return: header list, dict column name -> list of values, row count, offset after the last complete row
+    """
+    with open(path, "rb") as table:
+        header = table.readline().decode().rstrip("\n").split(';')
+        if offset > 0:
+            table.seek(offset)
+        start = table.tell()
+        data = table.read()
+    # a row that is still being written is left for the next run
+    data = data[:data.rfind(b"\n") + 1]
+    # Sometimes the last line of the table is \n
+    rows = [row.split(';') for row in data.decode().split("\n") if row.strip()]
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(header)}
+    return header, columns, len(rows), start + len(data)
+
+
+def get_summary_max(data_dir):
+    """
+    :return: highest input value and highest datatype from the run summary
+    """
+    maxinput = -1
+    maxdtype = -1
+    with open(glob.glob(data_dir + "E*-run-summary.dat")[0], "r") as f:
+        for line in f:
+            match = re.search(r"Inputs.*", line)
+            if match:
+                numbers = [int(x) for x in re.findall(r'\b\d+\b', match.group(0))]
+                maxinput = max(numbers)
+            match = re.search(r"Datatypes.*", line)
+            if match:
+                numbers = [int(x) for x in re.findall(r'\b\d+\b', match.group(0))]
+                maxdtype = max(numbers)
+    return maxinput, maxdtype
+
+
+def get_swept_variables(data_dir):
+    """
+    :return: table names of the variables configured with more than one value in the run summary
+    """
+    swept = []
+    with open(glob.glob(data_dir + "E*-run-summary.dat")[0], "r") as f:
+        for line in f:
+            match = re.match(r"\s*(\w+)\s*[:=]\s*(.*)", line)
+            if match and match.group(1) in summary_names and len(match.group(2).split()) > 1:
+                swept.append(summary_names[match.group(1)])
+    return swept
+
+
+def get_constellations(columns, nrows):
+    """
+    :return: switch constellation string of every row, like pre0split0pack0opt1ssl1fun0
+    """
+    switch_columns = [columns.get(name, [default] * nrows) for name, default in zip(switches_names, switches_defaults)]
+    return ["".join(short + column[r] for short, column in zip(switches_short, switch_columns)) for r in range(nrows)]
+
+
+def get_metrics(columns, nrows):
+    """
+    :return: list of the values of every metric in metric_names, per row, "NA" where the table lacks them
+    """
+    def number(name, r):
+        try:
+            return float(columns[name][r])
+        except (KeyError, ValueError):
+            return math.nan
+
+    metrics = []
+    for r in range(nrows):
+        runtime = number("runtime_chrono(s)", r)
+        elements = number("input_size", r)
+        bits = elements * number("datatype", r)
+        cpuseconds = number("jobCPU(%)", r) / 100 * number("runtime_external(s)", r)
+        # the phases are measured inside the external time, clock jitter must not make the rest negative
+        overhead = max(number("runtime_external(s)", r) - number("inittime(s)", r) - number("preproc(s)", r) - runtime, 0)
+        values = [runtime, elements / runtime if runtime else math.nan, bits / runtime if runtime else math.nan,
+                  number("P0dataSent(MB)", r) / elements if elements else math.nan,
+                  number("ALLdataSent(MB)", r) / elements if elements else math.nan,
+                  cpuseconds / elements if elements else math.nan,
+                  number("inittime(s)", r), number("preproc(s)", r), overhead, number("peakRAM(MiB)", r),
+                  number("comp.time(s)", r), number("comp.peakRAM(MiB)", r)]
+        values += [number(name, r) for name in instance_names + sampled_names]
+        metrics.append([value if math.isfinite(value) else "NA" for value in values])
+    return metrics
+
+
+def new_point():
+    return [Accumulator() for _ in metric_names]
+
+
+def add_point(point, values):
+    for accumulator, value in zip(point, values):
+        # most tables lack some metrics, skipped without the conversion error
+        if value != "NA":
+            accumulator.add(value)
+
+
+def parse_2D(columns, metrics, nrows, maxinput, maxdtype, references=None, plotfiles=None):
+    """
+    Sorts every row into the 2D plot files of all measured variables in one pass
+    :param metrics: metric values per row, see get_metrics
+    :param references: controlled variable values per protocol of previous runs, extended with new protocols
+    :param plotfiles: series of previous runs, extended with the new rows
+    :return: dict plot file path (relative to the testresults dir) -> dict x value -> Accumulator per metric, files
+     without matching rows included, and the set of files the new rows created or added points to
+    """
     # Only parse for variables that are measured in the table
-    if index_array[i] == -1:
-        continue
-
-    # print(str(i) + " Iteration")
-    # If table only contains one protocol
-    protocol = None
-
-    for line in dataset_array:
-        # Sometimes the last line of the table is \n
-        if line[0] == "\n":
+    measured = [i for i in range(len(variable_array)) if variable_array[i] in columns]
+    print("Measured variables: ", [variable_array[i] for i in measured])
+    last = len(variable_array) - 1
+
+    protocols = columns["protocol"]
+    # controlled variables are compared as floats, converted once per cell
+    values = {j: [float(value) for value in columns[variable_array[j]]] for j in measured}
+    constellations = get_constellations(columns, nrows)
+
+    # Needs to be sorted by protocol, MPSlice exporting order is different
+    order = sorted(range(nrows), key=lambda r: protocols[r])
+
+    # Fix every other configured parameter to the values of the first row of each protocol (controlled variables)
+    references = {} if references is None else references
+    for r in order:
+        if protocols[r] in references:
             continue
-
-        # When a new protocol is parsed
-        if protocol != line[protocol_index]:
-            # Update protocol
-            protocol = line[protocol_index]
-            protocols.append(protocol)
-
-            if not os.path.exists(data_dir + "parsed/2D/" + protocol):
-                os.mkdir(data_dir + "parsed/2D/" + protocol)
-
-            # Fill up the var_val array with initial values of every other configured parameter - have to be fix (controlled variables)
-            # skip the input size, found in previous step
-            for j in range(len(index_array)):
-                if index_array[j] != -1 and i != j:
-                    if j > 0 and j < len(index_array) - 1:
-                        var_val_array[j] = line[index_array[j]]
-                    elif j > 0:
-                        var_val_array[-1] = maxinput # Adapt: fix to highest input
-                    else:
-                        var_val_array[0] = maxdtype  # Adapt: fix to highest dtype
-                else:
-                    var_val_array[j] = None  # may be inefficient
-            print(protocol + " " +  str(var_name_array[i]) + " " +  str(var_val_array))
-
-            # Fill up metrics arrays
-            comm_rounds_array.append(line[comm_rounds_index])
-            data_sent_array.append(line[data_sent_index])
-
-        # default values in case the table is lacking them
-        pre = line[switch_indexes[0]] if switch_indexes[0] > 0 else 0
-        split = line[switch_indexes[1]] if switch_indexes[1] > 0 else 0
-        pack = line[switch_indexes[2]] if switch_indexes[2] > 0 else 0
-        opt = line[switch_indexes[3]] if switch_indexes[3] > 0 else 1
-        ssl = line[switch_indexes[4]] if switch_indexes[4] > 0 else 1
-        function = line[switch_indexes[5]] if switch_indexes[5] > 0 else 0
-        # we want all dtypes for variable input, so special case if handling input size
-        if i == len(index_array) - 1:
-            dtype = line[index_array[0]]
-            var_val_array[0] = None
-        else:
-            dtype = str(var_val_array[0]) if var_val_array[0] != None else "all"
-        # path of form parsed/2D/p1/d128Bwd_pre0split0pack0opt1ssl1fun0.txt
-        txtpathbase = data_dir + "parsed/2D/" + protocol + "/" + "d" + dtype + "_" + str(var_name_array[i])
-        txtpath = txtpathbase + "pre" + str(pre) + "split" + str(split) + "pack" + str(pack) + "opt" + str(opt) + "ssl" + str(ssl) + "fun" + str(function) + ".txt"
-        if txtpath != previous :
-            # Create 2D file descriptor
-            datafile2D = open(txtpath, "a", 1)
-            previous = txtpath
-
-        # Only parse line when it shows the initial values of controlled variables
-        #print(str([str(var_val_array[j]) + "  " + line[index_array[j]] for j in range(len(index_array))]) + " " + line[runtime_index])
-        #print([var_val_array[j] is None or int(var_val_array[j]) == int(line[index_array[j]]) for j in range(len(index_array))])
-        if all((var_val_array[j] is None or float(var_val_array[j]) == float(line[index_array[j]])) for j in range(len(index_array))):
-            datafile2D.write(line[index_array[i]] + '\t' + line[runtime_index] + '\n')
-
-datafile2D.close()
+        reference = {j: values[j][r] for j in measured}
+        reference[last] = float(maxinput)  # Adapt: fix to highest input
+        reference[0] = float(maxdtype)  # Adapt: fix to highest dtype
+        references[protocols[r]] = reference
+        print(protocols[r] + " " + str([reference.get(j) for j in range(len(variable_array))]))
+
+    # The file name datatype only depends on the variable, except for the input size and the scaling
+    # variables where we want all dtypes, so special case if handling those
+    dtypes = {i: (str(maxdtype) if i != 0 and 0 in measured else "all") for i in measured}
+    datatyped = [i for i in measured if variable_array[i] in per_datatype and (0 in measured or i == last)]
+
+    plotfiles = {} if plotfiles is None else plotfiles
+    changed = set()
+    for r in order:
+        protocol = protocols[r]
+        reference = references[protocol]
+        # variables deviating from the controlled values of the protocol
+        deviating = [j for j in measured if values[j][r] != reference[j]]
+
+        for i in measured:
+            dtype = columns["datatype"][r] if i in datatyped else dtypes[i]
+            # path of form parsed/2D/p1/d128_Bwd_pre0split0pack0opt1ssl1fun0.txt
+            txtpath = "parsed/2D/" + protocol + "/" + "d" + dtype + "_" + var_name_array[i] + constellations[r] + ".txt"
+            series = plotfiles.get(txtpath)
+            if series is None:
+                # new files are written without matching rows too, like in a full parse
+                series = plotfiles[txtpath] = {}
+                changed.add(txtpath)
+
+            # Only parse line when it shows the initial values of controlled variables
+            if all(j == i or (i in datatyped and j == 0) for j in deviating):
+                # repetitions of the same point are accumulated
+                add_point(series.setdefault(columns[variable_array[i]][r], new_point()), metrics[r])
+                changed.add(txtpath)
+
+    return plotfiles, changed
+
+
+def parse_3D(columns, metrics, nrows, maxdtype, references, swept, sort=None, plotfiles=None):
+    """
+    Pivots the rows into dense grids for every pair of swept variables, with the highest datatype
+    :param metrics: metric values per row, see get_metrics
+    :param references: controlled variable values per protocol, as extended by parse_2D
+    :param swept: table names of the variables swept in the run
+    :param sort: table name of the variable that forms the scanlines (y axis) of its grids
+    :return: dict plot file path -> dict "x\ty" -> Accumulator per metric, and the set of files the new
+     rows created or added points to
+    """
+    measured = [i for i in range(1, len(variable_array)) if variable_array[i] in columns and variable_array[i] in swept]
+    pairs = []
+    for pair in itertools.combinations(measured, 2):
+        # the sort variable forms the scanlines, which pgfplots expects as outer order
+        pairs.append(pair[::-1] if variable_array[pair[0]] == sort else pair)
+
+    protocols = columns["protocol"]
+    controlled = [j for j in range(len(variable_array)) if variable_array[j] in columns]
+    values = {j: [float(value) for value in columns[variable_array[j]]] for j in controlled}
+    constellations = get_constellations(columns, nrows)
+
+    plotfiles = {} if plotfiles is None else plotfiles
+    changed = set()
+    for r in range(nrows):
+        protocol = protocols[r]
+        deviating = [j for j in controlled if values[j][r] != references[protocol][j]]
+
+        for x, y in pairs:
+            # path of form parsed/3D/p1/d256_Lat_Bwd_pre0split0pack0opt1ssl1fun0.txt
+            txtpath = "parsed/3D/" + protocol + "/d" + str(maxdtype) + "_" + var_name_array[x] + var_name_array[y] + constellations[r] + ".txt"
+            grid = plotfiles.get(txtpath)
+            if grid is None:
+                grid = plotfiles[txtpath] = {}
+                changed.add(txtpath)
+
+            if all(j == x or j == y for j in deviating):
+                point = columns[variable_array[x]][r] + '\t' + columns[variable_array[y]][r]
+                add_point(grid.setdefault(point, new_point()), metrics[r])
+                changed.add(txtpath)
+
+    return plotfiles, changed
+
+
+def write_grid(datafile, grid):
+    # hashed index of the measured points, expanded to the dense grid of all x and y values
+    points = [point.split('\t') for point in grid]
+    xs = sorted(set(x for x, _ in points), key=float)
+    ys = sorted(set(y for _, y in points), key=float)
+    for y in ys:
+        for x in xs:
+            point = grid.get(x + '\t' + y, new_point())
+            datafile.write(x + '\t' + y + '\t' + '\t'.join(str(value) for accumulator in point for value in accumulator.stats()) + '\n')
+        datafile.write('\n')
+
+
+def write_plotfiles(data_dir, plotfiles, changed):
+    for txtpath in changed:
+        os.makedirs(os.path.dirname(data_dir + txtpath), exist_ok=True)
+        with open(data_dir + txtpath, "w") as datafile:
+            if txtpath.startswith("parsed/3D/"):
+                write_grid(datafile, plotfiles[txtpath])
+                continue
+            for x, point in plotfiles[txtpath].items():
+                datafile.write(x + '\t' + '\t'.join(str(value) for accumulator in point for value in accumulator.stats()) + '\n')
+
+
+def copy_timelines(data_dir, columns, nrows, references):
+    """
+    Copies the resource timeline of the first repetition of every protocol, datatype and input size
+    with the controlled values of the other variables into parsed/timelines
+    """
+    if "timeline" not in columns:
+        return
+    last = len(variable_array) - 1
+    controlled = [j for j in range(1, last) if variable_array[j] in columns]
+    constellations = get_constellations(columns, nrows)
+    for r in range(nrows):
+        protocol = columns["protocol"][r]
+        timeline = data_dir + "data/timelines/" + columns["timeline"][r]
+        if not os.path.isfile(timeline) or \
+                any(float(columns[variable_array[j]][r]) != references[protocol][j] for j in controlled):
+            continue
+        # path of form parsed/timelines/p1/d128_4096_pre0split0pack0opt1ssl1fun0.txt
+        txtpath = data_dir + "parsed/timelines/" + protocol + "/d" + columns["datatype"][r] + "_" + \
+            columns["input_size"][r] + "_" + constellations[r] + ".txt"
+        if not os.path.exists(txtpath):
+            os.makedirs(os.path.dirname(txtpath), exist_ok=True)
+            shutil.copyfile(timeline, txtpath)
+
+
+# format of the accumulator states in the checkpoint
+checkpoint_version = 2
+
+
+def get_schema(header, maxinput, maxdtype, swept, sort):
+    # everything a previous parsing result depends on besides the rows
+    return hashlib.sha256((";".join(header) + str((maxinput, maxdtype, swept, sort, metric_names, per_datatype))).encode()).hexdigest()
+
+
+def load_checkpoint(data_dir, table, schema):
+    """
+    :return: offset of the first unparsed row, the references of the parsed protocols and the parsed series,
+     None if a full rebuild is required
+    """
+    try:
+        with open(data_dir + "parsed-checkpoint.json") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isdir(data_dir + "parsed/2D") or checkpoint.get("table") != os.path.basename(table) or \
+            checkpoint.get("schema") != schema or checkpoint.get("version") != checkpoint_version or \
+            checkpoint.get("offset", 0) > os.path.getsize(table):
+        return None
+    references = {protocol: {int(j): value for j, value in reference.items()}
+                  for protocol, reference in checkpoint["references"].items()}
+    plotfiles = {txtpath: {x: [Accumulator(state) for state in point] for x, point in series}
+                 for txtpath, series in checkpoint["plotfiles"].items()}
+    return checkpoint["offset"], references, plotfiles
+
+
+def save_checkpoint(data_dir, table, schema, offset, references, plotfiles):
+    # series as lists of pairs to keep the x order, the accumulators hold a bounded state per point
+    plotfiles = {txtpath: [[x, [accumulator.state() for accumulator in point]] for x, point in series.items()]
+                 for txtpath, series in plotfiles.items()}
+    with open(data_dir + "parsed-checkpoint.json", "w") as f:
+        json.dump({"table": os.path.basename(table), "schema": schema, "version": checkpoint_version, "offset": offset,
+                   "references": references, "plotfiles": plotfiles}, f)
+
+
+if __name__ == "__main__":
+    # ----- ARGUMENTS --------
+    parser = argparse.ArgumentParser(
+        description='This program parses the measurement folder outputted by sevareslice (version from 03/23).')
+
+    parser.add_argument('data_dir', type=str, help='Required, testresults dir to parse.')
+    parser.add_argument('-s', type=str, help='(Optional) Sort table by <parameter> (3D parsing), it forms the y axis')
+    parser.add_argument('-f', "--force", action="store_true", help='(Optional) Force overwrite')
+    parser.add_argument('-i', "--incremental", action="store_true",
+                        help='(Optional) Only parse rows appended since the last run, full rebuild if the table changed')
+
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+
+    if data_dir[len(args.data_dir)-1] != '/':
+        data_dir += '/'
+
+    # ------- PARSING ---------
+
+    # Open datatable
+    data_table = find_table(data_dir)
+    if data_table is None:
+        print("Could not find a csv file with 'full' or 'short' in the name.")
+        exit()
+    print("Found results table...")
+
+    with open(data_table) as table:
+        header = table.readline().rstrip("\n").split(';')
+    maxinput, maxdtype = get_summary_max(data_dir)
+    swept = get_swept_variables(data_dir)
+    schema = get_schema(header, maxinput, maxdtype, swept, args.s)
+
+    checkpoint = load_checkpoint(data_dir, data_table, schema) if args.incremental else None
+
+    if checkpoint is not None:
+        offset, references, plotfiles = checkpoint
+        print("Continuing from checkpoint at byte " + str(offset) + "...")
+        header, columns, nrows, offset = load_table(data_table, offset)
+        print("Parsing " + str(nrows) + " new rows")
+        # the metrics of a row are shared by the 2D and 3D plot files
+        metrics = get_metrics(columns, nrows)
+        # - - - - - - - Parsing for 2D plots - - - - - - - -
+        plotfiles, changed = parse_2D(columns, metrics, nrows, maxinput, maxdtype, references, plotfiles)
+        # - - - - - - - Parsing for 3D plots - - - - - - - -
+        plotfiles, changed3D = parse_3D(columns, metrics, nrows, maxdtype, references, swept, args.s, plotfiles)
+        write_plotfiles(data_dir, plotfiles, changed | changed3D)
+        copy_timelines(data_dir, columns, nrows, references)
+    else:
+        if os.path.exists(data_dir + "parsed"):
+            if not args.force and not args.incremental:
+                print("Error, \"parsed\"-folder exits. Run parser with -f to force overwriting")
+                exit()
+
+            subprocess.run(["rm", "-rf", data_dir + "parsed"])
+
+        os.mkdir(data_dir + "parsed")
+        os.mkdir(data_dir + "parsed/2D")
+
+        header, columns, nrows, offset = load_table(data_table)
+        metrics = get_metrics(columns, nrows)
+        references = {}
+        # - - - - - - - Parsing for 2D plots - - - - - - - -
+        plotfiles, changed = parse_2D(columns, metrics, nrows, maxinput, maxdtype, references)
+        # - - - - - - - Parsing for 3D plots - - - - - - - -
+        plotfiles, changed3D = parse_3D(columns, metrics, nrows, maxdtype, references, swept, args.s, plotfiles)
+        write_plotfiles(data_dir, plotfiles, changed | changed3D)
+        copy_timelines(data_dir, columns, nrows, references)
+
+    # only incremental runs continue from the checkpoint, a full rebuild outdates an earlier one
+    if args.incremental:
+        save_checkpoint(data_dir, data_table, schema, offset, references, plotfiles)
+    elif os.path.exists(data_dir + "parsed-checkpoint.json"):
+        os.remove(data_dir + "parsed-checkpoint.json")
@@ -4,6 +4,11 @@
 # testing with dir="sevaremeasurements/results/2022-08/09_07-59-42"
 
 import argparse
+import concurrent.futures
+import hashlib
+import html
+import io
+import math
 import os
 import subprocess
 import time
@@ -12,11 +17,40 @@ import re
 import textwrap
 import glob
 
+from sevare_hardware import nodehardware
+
 colors = ['blue', 'red', 'orange', 'green', 'cyan', 'black']
-nodehardware = {}
-nodehardware.update({node: "Intel D-1518(2.2GHz) 32GiB 1Gbits" for node in ["dogecoin", "bitcoin", "ether", "todd", "rod", "ned"]})
-nodehardware.update({node: "AMD 7543(2.8GHz) 512GiB 25Gbits" for node in ["algofi", "gard", "goracle", "zone"]})
-nodehardware.update({node: "Intel 6312U(2.4GHz) 512GiB 25Gbits" for node in ["idex", "meld", "yieldly", "tinyman"]})
+
+# y axis series, selected with -y: index in metric_names of the parser (six columns each), axis label, frame title,
+# whether the value is divided by the datatype (runtime per instance)
+metrics = {
+    "runtime": (0, "runtime [s]", "Runtimes", True),
+    "elements": (1, "throughput [elements/s]", "Throughput", False),
+    "bits": (2, "throughput [bits/s]", "Throughput", False),
+    "p0sent": (3, "data sent by P0 [MB/element]", "Communication", False),
+    "allsent": (4, "data sent by all parties [MB/element]", "Communication", False),
+    "cpus": (5, "CPU time [s/element]", "CPU Time", False),
+    "init": (6, "init time [s]", "Init Times", False),
+    "preproc": (7, "preprocessing time [s]", "Preprocessing Times", False),
+    "overhead": (8, "external overhead [s]", "Overhead", False),
+    "ram": (9, "peak RAM [MiB]", "Peak RAM", False),
+    "comptime": (10, "compile time [s]", "Compile Times", False),
+    "compram": (11, "compile peak RAM [MiB]", "Compile Peak RAM", False),
+}
+# distribution of the concurrent instances of split role and multi-threaded runs, like init_p99 or chrono_max
+for i, name in enumerate(phase + "_" + stat for phase in ["init", "chrono"] for stat in ["min", "p50", "p90", "p99", "max", "mean"]):
+    phase, stat = name.split("_")
+    metrics[name] = (12 + i, phase + " time " + stat + " of the instances [s]", "Instance " + phase.capitalize() + " Times", False)
+# sampled during the protocol run
+metrics.update({
+    "cpuutil": (24, "mean core utilization [%]", "CPU Utilization", False),
+    "coremax": (25, "utilization of the busiest core [%]", "CPU Utilization", False),
+    "sampledram": (26, "sampled peak RAM [MiB]", "Sampled Peak RAM", False),
+    "txrate": (27, "mean send rate [Mbit/s]", "Network Rate", False),
+    "txmax": (28, "peak send rate [Mbit/s]", "Network Rate", False),
+    "rxrate": (29, "mean receive rate [Mbit/s]", "Network Rate", False),
+})
+metric = metrics["runtime"]
 
 legenddict = {
     "1": "Sharemind",
@@ -69,6 +103,84 @@ def fileExists(path, substring):
             return True
     return False
 
+def meanColumn(offset=1, name=None):
+    # offset 1 for 2D files after x, 2 for 3D files after x and y
+    return offset + 6 * (metrics[name] if name else metric)[0]
+
+def normalize(divisor):
+    return " / " + divisor if metric[3] else ""
+
+def hasErrorColumn(path):
+    # files parsed before repetitions were aggregated only contain x and runtime
+    if not os.path.exists(path):
+        return False
+    with open(path, "r") as f:
+        return len(f.readline().split("\t")) > meanColumn() + 5
+
+# figures referenced by the generated .tex files, hash -> standalone figure source
+figures = {}
+
+def includeFigure(file, tex_name, figure, plotpaths):
+    """
+    Includes the externalized figure, compiled once per content into the figure cache
+    :param figure: tikzpicture source, data paths relative to the plotted folder
+    :param plotpaths: data files read by the figure, part of the cache key
+    """
+    sevaredir_ = tex_name.split("plotted")[0]
+    digest = hashlib.sha256(figure.encode())
+    for plotpath in plotpaths:
+        path = sevaredir_ + plotpath[3:]
+        digest.update(plotpath.encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    digest = digest.hexdigest()[:32]
+    figures[digest] = figure
+    pdfpath = "../plotted-cache/" + digest + ".pdf"
+    indentor(file, 1, r"\IfFileExists{" + pdfpath + r"}{\includegraphics[width=\linewidth, height=0.7\textheight, keepaspectratio]{" +
+             pdfpath + r"}}{Figure " + digest + " failed to build}")
+
+def buildFigure(cachedir, digest):
+    # the figures read their data relative to the plotted folder
+    with open(cachedir + digest + ".tex", "w") as file:
+        indentor(file, 0, r"\documentclass[border=2pt]{standalone}")
+        indentor(file, 0, r"\usepackage{pgfplots}")
+        indentor(file, 0, r"\pgfplotsset{compat=newest}")
+        # same look as in the beamer document
+        indentor(file, 0, r"\renewcommand{\familydefault}{\sfdefault}")
+        indentor(file, 0, r"\begin{document}")
+        indentor(file, 0, r"\fontsize{8pt}{10pt}\selectfont")
+        file.write(figures[digest])
+        indentor(file, 0, r"\end{document}")
+    try:
+        subprocess.run(["pdflatex", "-interaction=nonstopmode", "-output-directory", cachedir, cachedir + digest + ".tex"],
+                       cwd=cachedir + "../plotted", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60)
+    except subprocess.TimeoutExpired:
+        pass
+    return digest, os.path.exists(cachedir + digest + ".pdf")
+
+def buildFigures(sevaredir, jobs):
+    """
+    Compiles the figures missing in the cache in parallel and removes figures no longer referenced
+    :return: hashes of the figures that failed to build
+    """
+    cachedir = os.path.abspath(sevaredir + "plotted-cache") + "/"
+    os.makedirs(cachedir, exist_ok=True)
+    stale = [digest for digest in figures if not os.path.exists(cachedir + digest + ".pdf")]
+    print("Building " + str(len(stale)) + " of " + str(len(figures)) + " figures, the others are cached")
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(jobs) as pool:
+        for digest, success in pool.map(lambda digest: buildFigure(cachedir, digest), stale):
+            if not success:
+                failed.append(digest)
+                print("    Figure build failed, see plotted-cache/" + digest + ".log")
+    # keep only the current figures, and the logs of the failed ones
+    for file in os.listdir(cachedir):
+        digest, extension = os.path.splitext(file)
+        if not (digest in figures and (extension == ".pdf" or digest in failed and extension in [".log", ".tex"])):
+            os.remove(cachedir + file)
+    return failed
+
 def genTex(tex_name, exp_prefix, plots, name, constellation, datatypemode=0):
     """
     Creates a .tex file for a single 2D plot
@@ -85,40 +197,565 @@ def genTex(tex_name, exp_prefix, plots, name, constellation, datatypemode=0):
         sectionname = r"\subsection{" + get_name(exp_prefix).split("[")[0] + name + " (" + legenddict[name.split(" ")[-1]] + ") " + getConsString(constellation) + "}"
         indentor(file, 0, sectionname)
         indentor(file, 0, r"\begin{frame}")
-        indentor(file, 0, r"\frametitle{MP-Slice Runtimes " + get_name(exp_prefix).split("[")[0] + name + " (" + legenddict[name.split(" ")[-1]] + ")}")
+        indentor(file, 0, r"\frametitle{MP-Slice " + metric[2] + " " + get_name(exp_prefix).split("[")[0] + name + " (" + legenddict[name.split(" ")[-1]] + ")}")
         indentor(file, 0, r"\begin{figure}")
-        indentor(file, 1, r"\begin{tikzpicture}[scale = 0.9]")
+        figure = io.StringIO()
+        plotpaths = []
+        indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
         # axis definition
-        indentor(file, 2, r"\begin{axis}[")
-        indentor(file, 3, "xlabel={" + get_name(exp_prefix) + "},")
-        indentor(file, 3, "ylabel={runtime [s]},")
-        indentor(file, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
-        indentor(file, 3, "scaled x ticks = false,x tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
-        indentor(file, 3, "legend style={anchor=west, legend pos=outer north east},")
-        indentor(file, 3, "%xmax=0.1,")
-        indentor(file, 3, "%ymax=0.1,")
-        indentor(file, 2, "]")
+        indentor(figure, 2, r"\begin{axis}[")
+        indentor(figure, 3, "xlabel={" + get_name(exp_prefix) + "},")
+        indentor(figure, 3, "ylabel={" + metric[1] + "},")
+        indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+        indentor(figure, 3, "scaled x ticks = false,x tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+        indentor(figure, 3, "legend style={anchor=west, legend pos=outer north east},")
+        indentor(figure, 3, "%xmax=0.1,")
+        indentor(figure, 3, "%ymax=0.1,")
+        indentor(figure, 2, "]")
 
         for g in range(len(plots)):
             plotpath = "../parsed/2D/"  + plots[g] + "_" + exp_prefix + getConsString(constellation) + ".txt"
-            #print("    " + plotpath)
+            plotpaths.append(plotpath)
             divisor = plots[g].split("/")[1][1:]
             # this is for the special case where x axis shows the datatype bits, need to divide each y value by the x value
             divisor = divisor if divisor != "all" else r"\thisrowno{0}"
-            dtypeNorm =  r" [y expr=\thisrowno{1} / " + divisor + "] "
-            indentor(file, 3, r"\addplot[mark=|, thick, color=" + colors[g] + "] table" + dtypeNorm + " {" + plotpath + "};")
+            # draw the 95% confidence interval of repeated measurements as error bars
+            errorbars = hasErrorColumn(tex_name.split("plotted")[0] + plotpath[3:])
+            errorNorm = r", y error expr=\thisrowno{" + str(meanColumn() + 5) + "}" + normalize(divisor) if errorbars else ""
+            errorStyle = ", error bars/.cd, y dir=both, y explicit" if errorbars else ""
+            dtypeNorm =  r" [y expr=\thisrowno{" + str(meanColumn()) + "}" + normalize(divisor) + errorNorm + "] "
+            indentor(figure, 3, r"\addplot[mark=|, thick, color=" + colors[g] + errorStyle + "] table" + dtypeNorm + " {" + plotpath + "};")
         
         mode = 1 if datatypemode else 0
         #print([plot.split("/") for plot in plots])
-        indentor(file, 3, r"\legend{" + ', '.join([legenddict[key.split("/")[mode]] for key in plots ]) + "}")
-        indentor(file, 2, r"\end{axis}")
-        indentor(file, 1, r"\end{tikzpicture}")
+        indentor(figure, 3, r"\legend{" + ', '.join([legenddict[key.split("/")[mode]] for key in plots ]) + "}")
+        indentor(figure, 2, r"\end{axis}")
+        indentor(figure, 1, r"\end{tikzpicture}")
+        includeFigure(file, tex_name, figure.getvalue(), plotpaths)
         # Plot information summary
         indentor(file, 1, r"\begin{itemize}")
         indentor(file, 1, r"\fontsize{6pt}{8pt}\selectfont")
         indentor(file, 1, r"\item Ref.Problem: Scalable Search")
         indentor(file, 1, r"\item Library: MP-Slice - " + name + " (" + legenddict[name.split(" ")[-1]] + ")")
-        indentor(file, 1, r"\item Metric: " + get_name(exp_prefix).split("[")[0] + " - runtime")
+        indentor(file, 1, r"\item Metric: " + get_name(exp_prefix).split("[")[0] + " - " + metric[1].split(" [")[0])
+        switchpositions = "Preprocessing: " + constellation["pre"] + ", Split Roles: " + constellation["split"]
+        switchpositions += ", Pack Bool: " + constellation["pack"] + ", Optimize Sharing: " + constellation["opt"]
+        switchpositions +=  ", SSL: " + constellation["ssl"] + ", Function: " + constellation["fun"]
+        indentor(file, 1, r"\item Switches: " + switchpositions)
+        indentor(file, 1, r"\item Specs: " + get_Specs(tex_name))
+        indentor(file, 1, r"\end{itemize}")
+
+        indentor(file, 0, r"\end{figure}")
+        indentor(file, 0, r"\end{frame}")
+
+# figures of the svg report in generation order, (svg path, title, info items)
+report = []
+
+def niceTicks(low, high, count=5):
+    # ticks on multiples of 1, 2 or 5 times a power of ten
+    raw = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(factor * magnitude for factor in [1, 2, 5, 10] if factor * magnitude >= raw)
+    first = math.ceil(low / step)
+    return [tick * step for tick in range(first, math.floor(high / step) + 1)]
+
+def formatTick(value):
+    return "{:.6g}".format(value)
+
+def genSvg(svg_name, exp_prefix, plots, name, constellation, datatypemode=0):
+    """
+    Creates a standalone .svg file for a single 2D plot, the same figure genTex draws
+    :param svg_name: name of the svg file
+    :param exp_prefix: bandwidth, cpus, freqs, etc
+    :param plots: list of protocol names to be included in the plot
+    :param name: Protocol, Datatype
+    """
+    mode = 1 if datatypemode else 0
+    series = []
+    for g in range(len(plots)):
+        plotpath = svg_name.split("plotted")[0] + "parsed/2D/" + plots[g] + "_" + exp_prefix + getConsString(constellation) + ".txt"
+        if not os.path.exists(plotpath):
+            continue
+        divisor = plots[g].split("/")[1][1:]
+        errorbars = hasErrorColumn(plotpath)
+        points = []
+        with open(plotpath, "r") as f:
+            for line in f:
+                values = [float(value) for value in line.split("\t")]
+                # this is for the special case where x axis shows the datatype bits, need to divide each y value by the x value
+                norm = (values[0] if divisor == "all" else float(divisor)) if metric[3] else 1
+                error = values[meanColumn() + 5] / norm if errorbars and math.isfinite(values[meanColumn() + 5]) else 0
+                if math.isfinite(values[meanColumn()]):
+                    points.append((values[0], values[meanColumn()] / norm, error))
+        series.append((colors[g], legenddict[plots[g].split("/")[mode]], points, False))
+    drawSvg(svg_name, series, get_name(exp_prefix), metric[1])
+
+    title = "MP-Slice " + metric[2] + " " + get_name(exp_prefix).split("[")[0] + name + " (" + legenddict[name.split(" ")[-1]] + ") " + getConsString(constellation)
+    switchpositions = "Preprocessing: " + constellation["pre"] + ", Split Roles: " + constellation["split"]
+    switchpositions += ", Pack Bool: " + constellation["pack"] + ", Optimize Sharing: " + constellation["opt"]
+    switchpositions +=  ", SSL: " + constellation["ssl"] + ", Function: " + constellation["fun"]
+    items = ["Ref.Problem: Scalable Search", "Library: MP-Slice - " + name + " (" + legenddict[name.split(" ")[-1]] + ")",
+             "Metric: " + get_name(exp_prefix).split("[")[0] + " - " + metric[1].split(" [")[0], "Switches: " + switchpositions,
+             "Specs: " + get_Specs(svg_name)]
+    report.append((svg_name, title, items))
+
+def drawSvg(svg_name, series, xlabel, ylabel):
+    """
+    Draws the series into a standalone .svg file
+    :param series: list of color, legend (None for no entry), list of x, y, error and whether to draw a dashed line
+    """
+    # canvas and plot area
+    width, height, left, right, top, bottom = 640, 400, 80, 470, 20, 340
+    xs = [x for _, _, points, _ in series for x, _, _ in points] or [0, 1]
+    ys = [y + sign * e for _, _, points, _ in series for _, y, e in points for sign in [-1, 1]] or [0, 1]
+    xmin, xmax = min(xs), max(xs)
+    ymin, ymax = min(ys), max(ys)
+    xmin, xmax = (xmin - 1, xmax + 1) if xmin == xmax else (xmin, xmax)
+    ymin, ymax = (ymin - 1, ymax + 1) if ymin == ymax else (ymin - (ymax - ymin) * 0.05, ymax + (ymax - ymin) * 0.05)
+
+    def sx(x):
+        return left + (x - xmin) / (xmax - xmin) * (right - left)
+
+    def sy(y):
+        return bottom - (y - ymin) / (ymax - ymin) * (bottom - top)
+
+    lines = ['<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" font-family="sans-serif" font-size="11">'.format(width, height)]
+    lines.append('<rect x="{}" y="{}" width="{}" height="{}" fill="none" stroke="black"/>'.format(left, top, right - left, bottom - top))
+    for tick in niceTicks(xmin, xmax):
+        lines.append('<line x1="{0:.1f}" y1="{1}" x2="{0:.1f}" y2="{2}" stroke="black"/>'.format(sx(tick), bottom, bottom + 4))
+        lines.append('<text x="{:.1f}" y="{}" text-anchor="middle">{}</text>'.format(sx(tick), bottom + 16, formatTick(tick)))
+    for tick in niceTicks(ymin, ymax):
+        lines.append('<line x1="{0}" y1="{1:.1f}" x2="{2}" y2="{1:.1f}" stroke="black"/>'.format(left - 4, sy(tick), left))
+        lines.append('<text x="{}" y="{:.1f}" text-anchor="end">{}</text>'.format(left - 6, sy(tick) + 4, formatTick(tick)))
+    lines.append('<text x="{}" y="{}" text-anchor="middle">{}</text>'.format((left + right) / 2, bottom + 36, html.escape(xlabel)))
+    lines.append('<text transform="translate(20 {}) rotate(-90)" text-anchor="middle">{}</text>'.format((top + bottom) / 2, html.escape(ylabel)))
+
+    entries = 0
+    for color, legend, points, dashed in series:
+        dash = ' stroke-dasharray="5,3"' if dashed else ''
+        if points:
+            lines.append('<polyline fill="none" stroke="{}" stroke-width="1.5"{} points="{}"/>'.format(
+                color, dash, " ".join("{:.1f},{:.1f}".format(sx(x), sy(y)) for x, y, _ in points)))
+        for x, y, error in ([] if dashed else points):
+            # |-marks and the 95% confidence interval of repeated measurements as error bars
+            lines.append('<line x1="{0:.1f}" y1="{1:.1f}" x2="{0:.1f}" y2="{2:.1f}" stroke="{3}" stroke-width="1.5"/>'.format(
+                sx(x), sy(y) - 4, sy(y) + 4, color))
+            if error > 0:
+                lines.append('<path d="M{0:.1f} {1:.1f}V{2:.1f}M{3:.1f} {1:.1f}H{4:.1f}M{3:.1f} {2:.1f}H{4:.1f}" stroke="{5}" fill="none"/>'.format(
+                    sx(x), sy(y - error), sy(y + error), sx(x) - 3, sx(x) + 3, color))
+        if legend is None:
+            continue
+        # legend outside north east
+        y = top + 10 + 16 * entries
+        lines.append('<line x1="{}" y1="{}" x2="{}" y2="{}" stroke="{}" stroke-width="1.5"{}/>'.format(right + 15, y, right + 35, y, color, dash))
+        lines.append('<text x="{}" y="{}">{}</text>'.format(right + 40, y + 4, html.escape(legend)))
+        entries += 1
+    lines.append('</svg>')
+    with open(svg_name, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+def writeReport(sevaredir):
+    # one html page collecting all svg figures, grouped like the sections of the latex document
+    with open(sevaredir + "plotted-svg/index.html", "w") as file:
+        indentor(file, 0, "<!DOCTYPE html>")
+        indentor(file, 0, '<html><head><meta charset="utf-8"><title>Sevarebench Measurement Results</title></head>')
+        indentor(file, 0, '<body style="font-family: sans-serif">')
+        indentor(file, 1, "<h1>Sevarebench Measurement Results</h1>")
+        indentor(file, 1, "<p>Built " + time.strftime("%y.%m.%d %H:%M", time.gmtime()) + " from " + html.escape(sevaredir) + "</p>")
+        section = ""
+        for svg_name, title, items in sorted(report):
+            relpath = svg_name.split("plotted-svg/")[-1]
+            if relpath.split("/")[1] != section:
+                section = relpath.split("/")[1]
+                indentor(file, 1, "<h2>" + section[2:] + "</h2>")
+            indentor(file, 1, "<h3>" + html.escape(title) + "</h3>")
+            indentor(file, 1, '<img src="' + relpath + '">')
+            indentor(file, 1, '<ul style="font-size: small">' + "".join("<li>" + html.escape(item) + "</li>" for item in items) + "</ul>")
+        indentor(file, 0, "</body></html>")
+
+def getScaling(path):
+    """
+    :return: list of thread or cpu count and mean runtime of the parsed sweep, sorted by the count
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        points = [(float(line.split("\t")[0]), float(line.split("\t")[1])) for line in f if line.strip()]
+    return sorted(point for point in points if math.isfinite(point[1]) and point[1] > 0)
+
+def getSwitchPositions(constellation):
+    switchpositions = "Preprocessing: " + constellation["pre"] + ", Split Roles: " + constellation["split"]
+    switchpositions += ", Pack Bool: " + constellation["pack"] + ", Optimize Sharing: " + constellation["opt"]
+    switchpositions +=  ", SSL: " + constellation["ssl"] + ", Function: " + constellation["fun"]
+    return switchpositions
+
+def writeSeries(figure, series):
+    # series computed in python, as in drawSvg, with the fitted and reference curves dashed
+    for color, legend, points, dashed in series:
+        # curves without legend entry stay out of the legend
+        style = ("dashed, " if dashed else "mark=|, ") + "thick, color=" + color + ("" if legend else ", forget plot")
+        coordinates = " ".join("(" + formatTick(x) + "," + repr(y) + ")" for x, y, _ in points)
+        indentor(figure, 3, r"\addplot[" + style + "] coordinates {" + coordinates + "};")
+    indentor(figure, 3, r"\legend{" + ", ".join(legend for _, legend, _, _ in series if legend) + "}")
+
+def writeFrame(tex_name, sectionname, frametitle, figure, items):
+    """
+    Creates a .tex file of one frame with the externalized figure and its information summary
+    """
+    with open(tex_name, "w") as file:
+        indentor(file, 0, "%% Built with sevareparser on day %%")
+        indentor(file, 0, "%%      " + time.strftime("%d %B %Y", time.gmtime()) + "      %%")
+        indentor(file, 0, r"\subsection{" + sectionname + "}")
+        indentor(file, 0, r"\begin{frame}")
+        indentor(file, 0, r"\frametitle{" + frametitle + "}")
+        indentor(file, 0, r"\begin{figure}")
+        includeFigure(file, tex_name, figure, [])
+        indentor(file, 1, r"\begin{itemize}")
+        indentor(file, 1, r"\fontsize{6pt}{8pt}\selectfont")
+        for item in items:
+            indentor(file, 1, r"\item " + item)
+        indentor(file, 1, r"\end{itemize}")
+        indentor(file, 0, r"\end{figure}")
+        indentor(file, 0, r"\end{frame}")
+
+def linearFit(points):
+    """
+    Least squares fit of y = a + b * x
+    :return: intercept a and slope b, None for less than two distinct x values
+    """
+    if len(points) < 2:
+        return None
+    xmean = sum(x for x, _ in points) / len(points)
+    ymean = sum(y for _, y in points) / len(points)
+    variance = sum((x - xmean) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    b = sum((x - xmean) * (y - ymean) for x, y in points) / variance
+    return ymean - b * xmean, b
+
+def amdahlFit(points):
+    """
+    Least squares fit of Amdahl's law T(p) = T1 * (f + (1 - f) / p), linear in 1/p
+    :return: serial fraction f and the fitted runtime function, None if the sweep is too short
+    """
+    fit = linearFit([(1 / p, t) for p, t in points])
+    if fit is None or fit[0] + fit[1] <= 0:
+        return None
+    a, b = fit
+    return min(max(a / (a + b), 0.0), 1.0), lambda p: a + b / p
+
+def genScaling(path, prefix, datatype, constellation, view, baseline):
+    """
+    Creates the figure of one scaling view of all protocols, for the selected backend
+    :param view: speedup, efficiency or baseline
+    :param baseline: protocol the other protocols are compared to in the baseline view
+    :return: False if there is nothing to plot
+    """
+    sweeps = {protocol: getScaling(sevaredir + "parsed/2D/" + protocol + "/" + datatype + "_" + prefix + getConsString(constellation) + ".txt")
+              for protocol in protocols}
+    sweeps = {protocol: points for protocol, points in sweeps.items() if len(points) > 1}
+    if not sweeps or view == "baseline" and baseline not in sweeps:
+        return False
+    series = []
+    fits = []
+    for g, (protocol, points) in enumerate(sweeps.items()):
+        # relative to the smallest measured count, which usually is 1
+        p0, t0 = points[0]
+        fit = amdahlFit(points)
+        if view == "speedup":
+            series.append((colors[g], legenddict[protocol], [(p, t0 / t, 0) for p, t in points], False))
+            if fit:
+                series.append((colors[g], None, [(p, fit[1](p0) / fit[1](p), 0) for p, _ in points], True))
+        elif view == "efficiency":
+            series.append((colors[g], legenddict[protocol], [(p, t0 / t / (p / p0), 0) for p, t in points], False))
+        else:
+            reference = dict(sweeps[baseline])
+            series.append((colors[g], legenddict[protocol], [(p, reference[p] / t, 0) for p, t in points if p in reference], False))
+        if fit:
+            # Gustafson's scaled speedup at the highest count for the fitted serial fraction
+            scaled = points[-1][0] / p0
+            fits.append(legenddict[protocol] + " f=" + "{:.3f}".format(fit[0]) + " (scaled speedup " + "{:.1f}".format(scaled - fit[0] * (scaled - 1)) + ")")
+    counts = sorted(set(p for points in sweeps.values() for p, _ in points))
+    if view == "speedup":
+        series.append(("black", "ideal", [(p, p / counts[0], 0) for p in counts], True))
+        ylabel, title = "speedup [T(1)/T(p)]", "Speedup"
+    elif view == "efficiency":
+        series.append(("black", "ideal", [(p, 1, 0) for p in counts], True))
+        ylabel, title = "parallel efficiency [T(1)/(p T(p))]", "Efficiency"
+    else:
+        series.append(("black", legenddict[baseline], [(p, 1, 0) for p in counts], True))
+        ylabel, title = "speedup vs " + legenddict[baseline] + " [T(" + legenddict[baseline] + ")/T]", "Speedup vs " + legenddict[baseline]
+
+    sectionname = "Scaling " + get_name(prefix) + " " + title + " -d " + datatype + " (" + legenddict[datatype] + ") " + getConsString(constellation)
+    items = ["Ref.Problem: Scalable Search", "Library: MP-Slice - Datatype -d " + datatype + " (" + legenddict[datatype] + ")",
+             "Metric: " + get_name(prefix) + " - " + ylabel.split(" [")[0] + ", relative to the lowest " + get_name(prefix),
+             "Serial fraction (Amdahl fit, dashed): " + ", ".join(fits), "Switches: " + getSwitchPositions(constellation),
+             "Specs: " + get_Specs(path)]
+
+    if path.endswith(".svg"):
+        drawSvg(path, series, get_name(prefix), ylabel)
+        report.append((path, "MP-Slice " + sectionname, items))
+        return True
+
+    figure = io.StringIO()
+    indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
+    indentor(figure, 2, r"\begin{axis}[")
+    indentor(figure, 3, "xlabel={" + get_name(prefix) + "},")
+    indentor(figure, 3, "ylabel={" + ylabel + "},")
+    indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "scaled x ticks = false,x tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "legend style={anchor=west, legend pos=outer north east},")
+    indentor(figure, 2, "]")
+    writeSeries(figure, series)
+    indentor(figure, 2, r"\end{axis}")
+    indentor(figure, 1, r"\end{tikzpicture}")
+    writeFrame(path, sectionname, "MP-Slice Scaling " + get_name(prefix) + " " + title + " -d " + datatype + " (" + legenddict[datatype] + ")",
+               figure.getvalue(), items)
+    return True
+
+def readMeans(path, name):
+    """
+    :return: dict x -> mean of the metric in a parsed 2D file, empty for missing files or files lacking the metric
+    """
+    if not os.path.exists(path):
+        return {}
+    column = meanColumn(1, name)
+    with open(path, "r") as f:
+        rows = [line.split("\t") for line in f if line.strip()]
+    return {float(row[0]): float(row[column]) for row in rows if len(row) > column}
+
+def drawStackedSvg(svg_name, categories, layers, xlabel, ylabel):
+    """
+    Draws stacked bars into a standalone .svg file
+    :param layers: list of color, legend and the value of every category, bottom layer first
+    """
+    width, height, left, right, top, bottom = 640, 400, 80, 470, 20, 340
+    totals = [sum(values[c] for _, _, values in layers) for c in range(len(categories))]
+    ymax = max(totals + [0]) * 1.05 or 1
+    slot = (right - left) / len(categories)
+
+    def sy(y):
+        return bottom - y / ymax * (bottom - top)
+
+    lines = ['<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" font-family="sans-serif" font-size="11">'.format(width, height)]
+    lines.append('<rect x="{}" y="{}" width="{}" height="{}" fill="none" stroke="black"/>'.format(left, top, right - left, bottom - top))
+    for tick in niceTicks(0, ymax):
+        lines.append('<line x1="{0}" y1="{1:.1f}" x2="{2}" y2="{1:.1f}" stroke="black"/>'.format(left - 4, sy(tick), left))
+        lines.append('<text x="{}" y="{:.1f}" text-anchor="end">{}</text>'.format(left - 6, sy(tick) + 4, formatTick(tick)))
+    for c, category in enumerate(categories):
+        x = left + slot * (c + 0.5)
+        lines.append('<text x="{:.1f}" y="{}" text-anchor="middle">{}</text>'.format(x, bottom + 16, html.escape(category)))
+        base = 0
+        for color, _, values in layers:
+            lines.append('<rect x="{:.1f}" y="{:.1f}" width="{:.1f}" height="{:.1f}" fill="{}" stroke="black"/>'.format(
+                x - slot * 0.3, sy(base + values[c]), slot * 0.6, sy(base) - sy(base + values[c]), color))
+            base += values[c]
+    lines.append('<text x="{}" y="{}" text-anchor="middle">{}</text>'.format((left + right) / 2, bottom + 36, html.escape(xlabel)))
+    lines.append('<text transform="translate(20 {}) rotate(-90)" text-anchor="middle">{}</text>'.format((top + bottom) / 2, html.escape(ylabel)))
+    for g, (color, legend, _) in enumerate(layers):
+        lines.append('<rect x="{}" y="{}" width="20" height="10" fill="{}" stroke="black"/>'.format(right + 15, top + 5 + 16 * g, color))
+        lines.append('<text x="{}" y="{}">{}</text>'.format(right + 40, top + 14 + 16 * g, html.escape(legend)))
+    lines.append('</svg>')
+    with open(svg_name, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+# runtime phases, stacked bottom up, metric and legend
+phases = [("init", "init"), ("preproc", "preprocessing"), ("runtime", "online"), ("overhead", "external overhead")]
+
+def genPhases(path, protocol, datatype, constellation):
+    """
+    Creates the figure of the runtime phases of one protocol over the input sizes, as stacked bars
+    :return: False if there is nothing to plot
+    """
+    plotpath = sevaredir + "parsed/2D/" + protocol + "/" + datatype + "_Inp_" + getConsString(constellation) + ".txt"
+    means = [readMeans(plotpath, phase) for phase, _ in phases]
+    sizes = sorted(means[2])
+    if not sizes or not all(means):
+        return False
+    categories = [str(int(size)) if size.is_integer() else formatTick(size) for size in sizes]
+    # phases missing in a run, like preprocessing when it is off, count as 0
+    layers = [(colors[g], legend, [values[size] if math.isfinite(values[size]) else 0 for size in sizes])
+              for g, ((_, legend), values) in enumerate(zip(phases, means))]
+
+    name = "Protocol -s " + protocol + " (" + legenddict[protocol] + ") -d " + datatype
+    sectionname = "Phases " + name + " " + getConsString(constellation)
+    items = ["Ref.Problem: Scalable Search", "Library: MP-Slice - " + name + " (" + legenddict[datatype] + ")",
+             "Metric: Input Size - init, preprocessing, online (runtime chrono) and the rest of the external runtime",
+             "Switches: " + getSwitchPositions(constellation), "Specs: " + get_Specs(path)]
+
+    if path.endswith(".svg"):
+        drawStackedSvg(path, categories, layers, "Input Size", "time [s]")
+        report.append((path, "MP-Slice " + sectionname, items))
+        return True
+
+    figure = io.StringIO()
+    indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
+    indentor(figure, 2, r"\begin{axis}[")
+    indentor(figure, 3, "ybar stacked, bar width=12pt, ymin=0,")
+    indentor(figure, 3, "symbolic x coords={" + ",".join(categories) + "}, xtick=data,")
+    indentor(figure, 3, "xlabel={Input Size},")
+    indentor(figure, 3, "ylabel={time [s]},")
+    indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "legend style={anchor=west, legend pos=outer north east},")
+    indentor(figure, 2, "]")
+    for color, _, values in layers:
+        coordinates = " ".join("(" + category + "," + repr(value) + ")" for category, value in zip(categories, values))
+        indentor(figure, 3, r"\addplot[fill=" + color + ", draw=black] coordinates {" + coordinates + "};")
+    indentor(figure, 3, r"\legend{" + ", ".join(legend for _, legend, _ in layers) + "}")
+    indentor(figure, 2, r"\end{axis}")
+    indentor(figure, 1, r"\end{tikzpicture}")
+    writeFrame(path, sectionname, "MP-Slice Phases " + name + " (" + legenddict[datatype] + ")", figure.getvalue(), items)
+    return True
+
+def genMemory(path, datatype, constellation):
+    """
+    Creates the figure of the peak RAM of all protocols over the input sizes, with fitted bytes per element
+    :return: False if there is nothing to plot
+    """
+    # RAM of the node type, to estimate the largest input that fits
+    specs = get_Specs(path)
+    noderam = re.search(r"(\d+)GiB", specs)
+    series = []
+    fits = []
+    for g, protocol in enumerate(protocols):
+        plotpath = sevaredir + "parsed/2D/" + protocol + "/" + datatype + "_Inp_" + getConsString(constellation) + ".txt"
+        points = sorted((x, y) for x, y in readMeans(plotpath, "ram").items() if math.isfinite(y))
+        if not points:
+            continue
+        series.append((colors[g], legenddict[protocol], [(x, y, 0) for x, y in points], False))
+        fit = linearFit(points)
+        if fit is None:
+            continue
+        intercept, slope = fit
+        series.append((colors[g], None, [(x, intercept + slope * x, 0) for x, _ in points], True))
+        fit = legenddict[protocol] + " " + "{:.1f}".format(slope * 1024 * 1024) + " B/element"
+        if noderam and slope > 0:
+            fit += ", ~" + "{:.3g}".format((int(noderam.group(1)) * 1024 - intercept) / slope) + " elements in " + noderam.group(0)
+        fits.append(fit)
+    if not series:
+        return False
+
+    name = "Datatype -d " + datatype
+    sectionname = "Peak RAM " + name + " (" + legenddict[datatype] + ") " + getConsString(constellation)
+    items = ["Ref.Problem: Scalable Search", "Library: MP-Slice - " + name + " (" + legenddict[datatype] + ")",
+             "Metric: Input Size - peak RAM (max resident set size)",
+             "Slope (linear fit, dashed): " + ", ".join(fits), "Switches: " + getSwitchPositions(constellation),
+             "Specs: " + specs]
+
+    if path.endswith(".svg"):
+        drawSvg(path, series, "Input Size", "peak RAM [MiB]")
+        report.append((path, "MP-Slice " + sectionname, items))
+        return True
+
+    figure = io.StringIO()
+    indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
+    indentor(figure, 2, r"\begin{axis}[")
+    indentor(figure, 3, "xlabel={Input Size},")
+    indentor(figure, 3, "ylabel={peak RAM [MiB]},")
+    indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "scaled x ticks = false,x tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "legend style={anchor=west, legend pos=outer north east},")
+    indentor(figure, 2, "]")
+    writeSeries(figure, series)
+    indentor(figure, 2, r"\end{axis}")
+    indentor(figure, 1, r"\end{tikzpicture}")
+    writeFrame(path, sectionname, "MP-Slice Peak RAM " + name + " (" + legenddict[datatype] + ")", figure.getvalue(), items)
+    return True
+
+# timeline views, columns of the timeline files after the time, axis label and legends
+timelineviews = {
+    "cpu": ([1, 2, 3], "core utilization [%]", ["mean", "busiest core", "idlest core"]),
+    "network": ([5, 6], "rate [Mbit/s]", ["send", "receive"]),
+    "memory": ([4], "RSS [MiB]", ["protocol binaries"]),
+}
+
+def genTimeline(path, protocol, datatype, inputsize, constellation, view):
+    """
+    Creates the figure of one resource view over the runtime of a single protocol run
+    :param view: cpu, network or memory
+    :return: False if there is nothing to plot
+    """
+    plotpath = sevaredir + "parsed/timelines/" + protocol + "/" + datatype + "_" + inputsize + "_" + getConsString(constellation) + ".txt"
+    if not os.path.exists(plotpath):
+        return False
+    with open(plotpath, "r") as f:
+        rows = [[float(value) for value in line.split("\t")] for line in f if line.strip()]
+    columns, ylabel, legends = timelineviews[view]
+    series = [(colors[g], legend, [(row[0], row[column], 0) for row in rows], False) for g, (column, legend) in enumerate(zip(columns, legends))]
+
+    name = "Protocol -s " + protocol + " (" + legenddict[protocol] + ") -d " + datatype + " -i " + inputsize
+    sectionname = "Timeline " + view + " " + name + " " + getConsString(constellation)
+    items = ["Ref.Problem: Scalable Search", "Library: MP-Slice - " + name + " (" + legenddict[datatype] + ")",
+             "Metric: time [s] - " + ylabel.split(" [")[0] + " sampled during the first repetition",
+             "Switches: " + getSwitchPositions(constellation), "Specs: " + get_Specs(path)]
+
+    if path.endswith(".svg"):
+        drawSvg(path, series, "time [s]", ylabel)
+        report.append((path, "MP-Slice " + sectionname, items))
+        return True
+
+    figure = io.StringIO()
+    indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
+    indentor(figure, 2, r"\begin{axis}[")
+    indentor(figure, 3, "xlabel={time [s]},")
+    indentor(figure, 3, "ylabel={" + ylabel + "}, ymin=0,")
+    indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+    indentor(figure, 3, "legend style={anchor=west, legend pos=outer north east}, no marks,")
+    indentor(figure, 2, "]")
+    writeSeries(figure, series)
+    indentor(figure, 2, r"\end{axis}")
+    indentor(figure, 1, r"\end{tikzpicture}")
+    writeFrame(path, sectionname, "MP-Slice Timeline " + name, figure.getvalue(), items)
+    return True
+
+def isSurface(path):
+    # only grids spanning at least two values on both axes with measured points make a surface
+    with open(path, "r") as f:
+        points = [line.split("\t") for line in f if line.strip()]
+    xs = set(point[0] for point in points)
+    ys = set(point[1] for point in points)
+    return len(xs) > 1 and len(ys) > 1 and any(point[meanColumn(2)] != "nan" for point in points)
+
+def genTex3D(tex_name, x_prefix, y_prefix, plot, name, constellation):
+    """
+    Creates a .tex file for a single 3D plot, shown as heatmap
+    :param tex_name: name of the tex file
+    :param x_prefix: variable on the x axis, bandwidth, cpus, freqs, etc
+    :param y_prefix: variable on the y axis
+    :param plot: protocol/datatype of the grid
+    :param name: Protocol
+    """
+    sweep = get_name(x_prefix).split("[")[0] + "x " + get_name(y_prefix).split("[")[0]
+    with open(tex_name, "w") as file:
+        indentor(file, 0, "%% Built with sevareparser on day %%")
+        indentor(file, 0, "%%      " + time.strftime("%d %B %Y", time.gmtime()) + "      %%")
+        indentor(file, 0, r"\subsection{" + sweep + name + " (" + legenddict[name.split(" ")[-1]] + ") " + getConsString(constellation) + "}")
+        indentor(file, 0, r"\begin{frame}")
+        indentor(file, 0, r"\frametitle{MP-Slice " + metric[2] + " " + sweep + name + " (" + legenddict[name.split(" ")[-1]] + ")}")
+        indentor(file, 0, r"\begin{figure}")
+        figure = io.StringIO()
+        indentor(figure, 1, r"\begin{tikzpicture}[scale = 0.9]")
+        # axis definition
+        indentor(figure, 2, r"\begin{axis}[")
+        indentor(figure, 3, "xlabel={" + get_name(x_prefix) + "},")
+        indentor(figure, 3, "ylabel={" + get_name(y_prefix) + "},")
+        indentor(figure, 3, "view={0}{90}, colorbar, colorbar style={ylabel={" + metric[1] + "}},")
+        indentor(figure, 3, "scaled x ticks = false,x tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+        indentor(figure, 3, "scaled y ticks = false,y tick label style={/pgf/number format/fixed,/pgf/number format/precision=8},")
+        indentor(figure, 2, "]")
+
+        plotpath = "../parsed/3D/" + plot + "_" + x_prefix + y_prefix + getConsString(constellation) + ".txt"
+        divisor = plot.split("/")[1][1:]
+        indentor(figure, 3, r"\addplot3[surf, shader=flat corner, mesh/ordering=x varies, unbounded coords=jump] table [z expr=\thisrowno{" + str(meanColumn(2)) + "}" + normalize(divisor) + "] {" + plotpath + "};")
+        indentor(figure, 2, r"\end{axis}")
+        indentor(figure, 1, r"\end{tikzpicture}")
+        includeFigure(file, tex_name, figure.getvalue(), [plotpath])
+        # Plot information summary
+        indentor(file, 1, r"\begin{itemize}")
+        indentor(file, 1, r"\fontsize{6pt}{8pt}\selectfont")
+        indentor(file, 1, r"\item Ref.Problem: Scalable Search")
+        indentor(file, 1, r"\item Library: MP-Slice - " + name + " (" + legenddict[name.split(" ")[-1]] + ") -d " + divisor)
+        indentor(file, 1, r"\item Metric: " + sweep + "- " + metric[1].split(" [")[0])
         switchpositions = "Preprocessing: " + constellation["pre"] + ", Split Roles: " + constellation["split"]
         switchpositions += ", Pack Bool: " + constellation["pack"] + ", Optimize Sharing: " + constellation["opt"]
         switchpositions +=  ", SSL: " + constellation["ssl"] + ", Function: " + constellation["fun"]
@@ -136,10 +773,20 @@ parser = argparse.ArgumentParser(
 
 parser.add_argument('sevaredir', type=str, help='Required, testresults dir to plot.')
 parser.add_argument('-f', "--force", action="store_true", help='(Optional) Force overwrite')
+parser.add_argument('-y', "--metric", type=str, default="runtime", choices=list(metrics),
+                    help='(Optional) y axis series: runtime, elements/s, bits/s, MB sent per element by P0 or all '
+                         'parties, CPU seconds per element, phase times, peak RAM, compile time and RAM (default: runtime)')
+parser.add_argument('--svg', action="store_true",
+                    help='(Optional) Quick report of svg figures in "plotted-svg", without latex, always overwritten')
+parser.add_argument('-b', "--baseline", type=str, default="2",
+                    help='(Optional) protocol the others are compared to in the scaling views (default: 2, Replicated)')
+parser.add_argument('-j', "--jobs", type=int, default=os.cpu_count(),
+                    help='(Optional) number of figures compiled in parallel (default: all cores)')
 
 args = parser.parse_args()
 
 sevaredir = args.sevaredir
+metric = metrics[args.metric]
 
 if sevaredir[-1] != '/':
     sevaredir += '/'
@@ -150,15 +797,20 @@ if "parsed" not in os.listdir(sevaredir):
     print("Could not find the parsed directory, make sure you executed SevareParser before calling the plotter.")
     exit()
 
+# the svg report uses the same layout in its own folder
+plotdir = "plotted-svg/" if args.svg else "plotted/"
+figext = ".svg" if args.svg else ".tex"
+genFigure = genSvg if args.svg else genTex
+
 # Create directory
-if os.path.exists(sevaredir + "plotted"):
-    if not args.force:
+if os.path.exists(sevaredir + plotdir):
+    if not args.force and not args.svg:
         print("Error, \"plotted\"-folder exits. Run plotter with -f to force overwriting")
         exit()
 
-    subprocess.run(["rm", "-rf", sevaredir + "plotted"])
+    subprocess.run(["rm", "-rf", sevaredir + plotdir])
 
-os.mkdir(sevaredir + "plotted/")
+os.mkdir(sevaredir + plotdir)
 
 # - - - - - - - - CREATE 2D PLOTS - - - - - - - - - - -
 
@@ -172,6 +824,15 @@ print("Commencing 2D Plotting...")
 protocols = sorted(os.listdir(sevaredir + "parsed/2D/"))
 plots = os.listdir(sevaredir + "parsed/2D/" + protocols[0])
 
+# the derived metrics are only in files of the current parser, checked in the first plot file with a point since
+# the parser also writes empty files for variables without matching rows
+if metric[0] > 0:
+    parsedfile = next((path for path in sorted(glob.glob(sevaredir + "parsed/2D/*/*.txt")) if os.path.getsize(path) > 0),
+                      None)
+    if parsedfile is not None and not hasErrorColumn(parsedfile):
+        print("The parsed files lack the " + args.metric + " metric, re-run the parser with -f")
+        exit()
+
 # capture all plotfiles to plot
 for plot in plots:
     datatypes.append(plot.split("_")[0]) if plot.split("_")[0] != "dall" else None
@@ -212,7 +873,7 @@ print("First switch constellation: ", getConsString(constellations[0]))
 print()
 
 # generate .tex files into an "include" folder
-os.mkdir(sevaredir + "plotted/include")
+os.mkdir(sevaredir + plotdir + "include")
 
 ## inputsize - runtime (should be always true)
 ######
@@ -221,25 +882,25 @@ if "Inp" not in prefixes:
     print("No *_Inp_* found, should exist in any correctly parsed folder")
     exit()
 
-os.mkdir(sevaredir + "plotted/include/02input")
+os.mkdir(sevaredir + plotdir + "include/02input")
 
 # protocol view
 for constellation in constellations:
     for protocol in protocols:
         plots = [protocol + "/" + datatype for datatype in datatypes]
-        savepath = "plotted/include/02input/0s" + protocol + "_" + getConsString(constellation) + ".tex"
-        genTex(sevaredir + savepath, "Inp_", plots, " Protocol -s " + protocol, constellation, 1)
+        savepath = plotdir + "include/02input/0s" + protocol + "_" + getConsString(constellation) + figext
+        genFigure(sevaredir + savepath, "Inp_", plots, " Protocol -s " + protocol, constellation, 1)
         print(" generated " + savepath)
 
 # datatype view
 for constellation in constellations:
     for i,datatype in enumerate(datatypes,2):
         plots = [protocol + "/" + datatype for protocol in protocols]
-        savepath = "plotted/include/02input/0" + str(i) + datatype + "_" + getConsString(constellation) + ".tex"
-        genTex(sevaredir + savepath, "Inp_", plots, " Datatype -d " + datatype, constellation)
+        savepath = plotdir + "include/02input/0" + str(i) + datatype + "_" + getConsString(constellation) + figext
+        genFigure(sevaredir + savepath, "Inp_", plots, " Datatype -d " + datatype, constellation)
         print(" generated " + savepath)
 
-os.mkdir(sevaredir + "plotted/include/01manipulations")
+os.mkdir(sevaredir + plotdir + "include/01manipulations")
 
 ## fixed input views, using the highest input value
 ######
@@ -259,8 +920,8 @@ for i,prefix in enumerate(["Thd_", "txB_", "rxB_", "Lat_", "Bwd_", "Pdr_", "Frq_
     testtypes += prefix
     for constellation in constellations:
         plots = [protocol + "/d" + str(maxdtype) for protocol in protocols]
-        savepath = "plotted/include/01manipulations/0" + str(i) + "d" + str(maxdtype) + "_" + prefix + getConsString(constellation) + ".tex"
-        genTex(sevaredir + savepath, prefix, plots, "Fixed Input: " + str(maxinput) + " -d " + datatype, constellation)
+        savepath = plotdir + "include/01manipulations/0" + str(i) + "d" + str(maxdtype) + "_" + prefix + getConsString(constellation) + figext
+        genFigure(sevaredir + savepath, prefix, plots, "Fixed Input: " + str(maxinput) + " -d " + datatype, constellation)
         print(" generated " + savepath)
 
 testtypes = testtypes or "Inp_"
@@ -268,10 +929,74 @@ testtypes = testtypes or "Inp_"
 # datatypes
 for constellation in constellations:
     plots = [protocol + "/dall" for protocol in protocols]
-    savepath = "plotted/include/01manipulations/09dall" + "_" + getConsString(constellation) + ".tex"
-    genTex(sevaredir + savepath, "Dtp_", plots, "Fixed Input: " + str(maxinput) + " all", constellation)
+    savepath = plotdir + "include/01manipulations/09dall" + "_" + getConsString(constellation) + figext
+    genFigure(sevaredir + savepath, "Dtp_", plots, "Fixed Input: " + str(maxinput) + " all", constellation)
     print(" generated " + savepath)
 
+## scaling of the thread and cpu sweeps, for every datatype
+######
+for i,prefix in enumerate(["Thd_", "Cpu_"],1):
+    if prefix not in testtypes:
+        continue
+    os.makedirs(sevaredir + plotdir + "include/04scaling", exist_ok=True)
+    for constellation in constellations:
+        for datatype in datatypes:
+            for n,view in enumerate(["speedup", "efficiency", "baseline"],1):
+                savepath = plotdir + "include/04scaling/0" + str(i) + datatype + "_" + prefix + getConsString(constellation) + "_" + str(n) + view + figext
+                if genScaling(sevaredir + savepath, prefix, datatype, constellation, view, args.baseline):
+                    print(" generated " + savepath)
+
+## runtime phases and memory over the input size, with the highest datatype
+######
+# files of parsers before the phase metrics lack them, nothing is generated then
+os.mkdir(sevaredir + plotdir + "include/05resources")
+for constellation in constellations:
+    for protocol in protocols:
+        savepath = plotdir + "include/05resources/01s" + protocol + "_" + getConsString(constellation) + "_phases" + figext
+        if genPhases(sevaredir + savepath, protocol, "d" + str(maxdtype), constellation):
+            print(" generated " + savepath)
+    for datatype in datatypes:
+        savepath = plotdir + "include/05resources/02" + datatype + "_" + getConsString(constellation) + "_memory" + figext
+        if genMemory(sevaredir + savepath, datatype, constellation):
+            print(" generated " + savepath)
+if not os.listdir(sevaredir + plotdir + "include/05resources"):
+    os.rmdir(sevaredir + plotdir + "include/05resources")
+
+## resource timelines of the runs with the highest datatype and input, sampled on the first node
+######
+if os.path.exists(sevaredir + "parsed/timelines"):
+    os.mkdir(sevaredir + plotdir + "include/06timelines")
+    for constellation in constellations:
+        for protocol in protocols:
+            for n,view in enumerate(timelineviews,1):
+                savepath = plotdir + "include/06timelines/0s" + protocol + "_" + getConsString(constellation) + "_" + str(n) + view + figext
+                if genTimeline(sevaredir + savepath, protocol, "d" + str(maxdtype), str(maxinput), constellation, view):
+                    print(" generated " + savepath)
+    if not os.listdir(sevaredir + plotdir + "include/06timelines"):
+        os.rmdir(sevaredir + plotdir + "include/06timelines")
+
+## two variable sweeps, one heatmap per protocol
+######
+if os.path.exists(sevaredir + "parsed/3D") and not args.svg:
+    os.mkdir(sevaredir + plotdir + "include/03surfaces")
+    for protocol in sorted(os.listdir(sevaredir + "parsed/3D")):
+        for plot in sorted(os.listdir(sevaredir + "parsed/3D/" + protocol)):
+            if not isSurface(sevaredir + "parsed/3D/" + protocol + "/" + plot):
+                continue
+            datatype, xprefix, yprefix, consstring = plot[:-4].split("_")
+            constellation = {}
+            for switch, position in re.findall(r'([A-Za-z]+)([0123456789])', consstring):
+                constellation[switch] = position
+            savepath = plotdir + "include/03surfaces/0" + protocol + "_" + plot[:-4] + figext
+            genTex3D(sevaredir + savepath, xprefix + "_", yprefix + "_", protocol + "/" + datatype, " Protocol -s " + protocol, constellation)
+            print(" generated " + savepath)
+
+if args.svg:
+    writeReport(sevaredir)
+    print("Report built:")
+    print("    " + sevaredir + "plotted-svg/index.html")
+    exit()
+
 ### build main tex file
 node = ""
 aborted = ""
@@ -363,6 +1088,9 @@ with open(sevaredir + "plotted/sevareplots.tex", "w") as file:
     indentor(file, 0, r"\end{document}")
 
 
+# every figure is compiled on its own and cached, the document only assembles the figure pdfs
+buildFigures(sevaredir, args.jobs)
+
 os.chdir(sevaredir + "plotted")
 print("Building latex file plotted/sevareplots.tex")
 print("Please wait ... (Timeout set to 60s)")
@@ -0,0 +1,253 @@
+# Results store of many sevarebench result folders in one indexed SQLite database,
+# to compare runs across hardware, dates and MP-Slice versions without re-parsing the tables
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from sevare_hardware import nodehardware
+from sevare_parser import find_table, load_table
+
+
+# switch positions configured in the run summary
+summary_switches = {"Function": "function", "Preprocessing": "preprocess", "SplitRoles": "splitroles",
+                    "Pack Bool": "packbool", "Optimized Sharing": "optshare", "SSL": "ssl"}
+
+# query filters -> columns of the rows view
+filters = {"protocol": "protocol", "dtype": "datatype", "input": "input_size", "nodes": "nodes", "cpu": "cpu",
+           "link": "link_gbits"}
+
+schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    run TEXT,
+    table_size INTEGER,
+    table_mtime REAL,
+    experiment TEXT,
+    nodes TEXT,
+    hardware TEXT,
+    cpu TEXT,
+    link_gbits REAL,
+    measured_gbits REAL,
+    function TEXT,
+    preprocess TEXT,
+    splitroles TEXT,
+    packbool TEXT,
+    optshare TEXT,
+    ssl TEXT,
+    status TEXT,
+    ingested REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+    protocol,
+    datatype,
+    input_size
+);
+CREATE INDEX IF NOT EXISTS results_point ON results (protocol, datatype, input_size);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS runs_hardware ON runs (link_gbits, cpu);
+"""
+
+
+def quote(name):
+    # table column names like runtime_chrono(s) are kept as they are
+    return '"' + name.replace('"', '""') + '"'
+
+
+def to_value(value):
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return None if value in ("", "NA", "NAs") else value
+
+
+def read_summary(data_dir):
+    """
+    :return: dict runs column -> value from the run summary
+    """
+    summary = {"nodes": None, "hardware": None, "cpu": None, "link_gbits": None, "measured_gbits": None,
+               "experiment": None, "status": None}
+    speeds = []
+    paths = glob.glob(data_dir + "E*-run-summary.dat")
+    if not paths:
+        return summary
+    with open(paths[0]) as f:
+        for line in f:
+            match = re.match(r"\s*([\w ]+?)\s*[:=]\s*(.*)", line)
+            if "Experiment run status" in line:
+                summary["status"] = line.split(":")[-1].strip()
+            elif "total sender speed" in line:
+                # iperf3 totals of the speedtest, in Gbits/sec
+                speeds += [float(x) for x in re.findall(r"[\d.]+", line.split(":")[-1])[:1]]
+            elif match and match.group(1) == "Nodes":
+                summary["nodes"] = match.group(2).strip()
+            elif match and match.group(1) == "Experiment":
+                summary["experiment"] = match.group(2).strip() or None
+            elif match and match.group(1) in summary_switches:
+                summary[summary_switches[match.group(1)]] = match.group(2).strip()
+    if summary["nodes"]:
+        hardware = nodehardware.get(summary["nodes"].split()[0])
+        if hardware:
+            summary["hardware"] = hardware
+            summary["cpu"] = hardware.split(" ")[0] + " " + hardware.split(" ")[1]
+            summary["link_gbits"] = float(re.search(r"([\d.]+)Gbits", hardware).group(1))
+    if speeds:
+        summary["measured_gbits"] = max(speeds)
+    return summary
+
+
+def add_columns(db, header):
+    existing = {row[1] for row in db.execute("PRAGMA table_info(results)")}
+    for name in header:
+        if name not in existing:
+            db.execute("ALTER TABLE results ADD COLUMN " + quote(name))
+            existing.add(name)
+
+
+def create_view(db):
+    # every result row with the metadata of its run
+    run_columns = [row[1] for row in db.execute("PRAGMA table_info(runs)") if row[1] != "id"]
+    result_columns = [row[1] for row in db.execute("PRAGMA table_info(results)")]
+    # switches of the table take precedence over the configured ones of the summary
+    columns = ["results." + quote(name) for name in result_columns]
+    columns += ["runs." + quote(name) for name in run_columns if name not in result_columns]
+    db.execute("DROP VIEW IF EXISTS rows")
+    db.execute("CREATE VIEW rows AS SELECT " + ", ".join(columns) + " FROM results JOIN runs ON runs.id = results.run_id")
+
+
+def ingest(db, data_dir, force=False):
+    """
+    Loads the results table of one result folder, replacing an outdated previous ingest
+    :return: number of ingested rows, 0 if the folder was ingested before and is unchanged, -1 if there is no table
+    """
+    table = find_table(data_dir) if os.path.isdir(data_dir + "data") else None
+    if table is None:
+        return -1
+    path = os.path.realpath(data_dir)
+    stat = os.stat(table)
+    previous = db.execute("SELECT id, table_size, table_mtime FROM runs WHERE path = ?", (path,)).fetchone()
+    if previous and not force and previous[1:] == (stat.st_size, stat.st_mtime):
+        return 0
+    if previous:
+        db.execute("DELETE FROM results WHERE run_id = ?", (previous[0],))
+        db.execute("DELETE FROM runs WHERE id = ?", (previous[0],))
+
+    summary = read_summary(data_dir)
+    # run name like 2023-02/01_17-01-02
+    run = "/".join(path.split(os.sep)[-2:])
+    columns = ["path", "run", "table_size", "table_mtime", "ingested"] + list(summary)
+    run_id = db.execute("INSERT INTO runs (" + ", ".join(columns) + ") VALUES (" + ", ".join("?" * len(columns)) + ")",
+                        [path, run, stat.st_size, stat.st_mtime, time.time()] + list(summary.values())).lastrowid
+
+    header, table_columns, nrows, _ = load_table(table)
+    add_columns(db, header)
+    values = [[to_value(value) for value in table_columns[name]] for name in header]
+    db.executemany("INSERT INTO results (run_id, " + ", ".join(quote(name) for name in header) + ") VALUES (?" +
+                   ", ?" * len(header) + ")", ([run_id] + [column[r] for column in values] for r in range(nrows)))
+    return nrows
+
+
+def query(db, args):
+    conditions, parameters = [], []
+    for option, column in filters.items():
+        value = getattr(args, option)
+        if value is None:
+            continue
+        if column in ("nodes", "cpu"):
+            conditions.append(quote(column) + " LIKE ?")
+            parameters.append("%" + value + "%")
+        else:
+            conditions.append(quote(column) + " = ?")
+            parameters.append(to_value(value))
+    for where in args.where or []:
+        column, value = where.split("=", 1)
+        conditions.append(quote(column) + " = ?")
+        parameters.append(to_value(value))
+    columns = ["run", "protocol", "datatype", "input_size"] + (args.column or ["runtime_chrono(s)"])
+    sql = "SELECT " + ", ".join(quote(column) for column in columns) + " FROM rows"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY run, protocol, datatype, input_size"
+    return columns, db.execute(sql, parameters)
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.executescript(schema)
+    return db
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Indexed store of the results of many sevarebench result folders.')
+    parser.add_argument('--db', type=str, default="sevare-results.db",
+                        help='(Optional) path of the SQLite store (default: sevare-results.db)')
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="load result folders into the store")
+    ingest_parser.add_argument('data_dirs', type=str, nargs="+",
+                               help='Required, testresults dirs, or folders searched for testresults dirs with -r')
+    ingest_parser.add_argument('-r', "--recursive", action="store_true",
+                               help='(Optional) ingest every testresults dir below the given folders')
+    ingest_parser.add_argument('-f', "--force", action="store_true", help='(Optional) re-ingest unchanged folders')
+
+    query_parser = commands.add_parser("query", help="print matching result rows, tab separated")
+    query_parser.add_argument('-p', '--protocol', type=str, help='(Optional) protocol number')
+    query_parser.add_argument('-d', '--dtype', type=str, help='(Optional) datatype width, like 256')
+    query_parser.add_argument('-i', '--input', type=str, help='(Optional) input size')
+    query_parser.add_argument('--nodes', type=str, help='(Optional) node name contained in the nodes of the run')
+    query_parser.add_argument('--cpu', type=str, help='(Optional) part of the CPU model, like 7543')
+    query_parser.add_argument('--link', type=str, help='(Optional) nominal link speed in Gbit/s, like 25')
+    query_parser.add_argument('-w', '--where', type=str, action="append",
+                              help='(Optional, repeatable) <column>=<value> on any table column, like "latencies(ms)=5"')
+    query_parser.add_argument('-c', '--column', type=str, action="append",
+                              help='(Optional, repeatable) column to print (default: runtime_chrono(s))')
+    query_parser.add_argument('--sql', type=str, help='(Optional) run a custom query, the view "rows" joins all data')
+
+    args = parser.parse_args()
+
+    db = connect(args.db)
+
+    if args.command == "ingest":
+        data_dirs = []
+        for data_dir in args.data_dirs:
+            if args.recursive:
+                # a testresults dir holds the run summary
+                data_dirs += sorted(os.path.dirname(path) for path in
+                                    glob.glob(os.path.join(data_dir, "**", "E*-run-summary.dat"), recursive=True))
+            else:
+                data_dirs.append(data_dir)
+        with db:
+            for data_dir in data_dirs:
+                data_dir = data_dir if data_dir.endswith('/') else data_dir + '/'
+                rows = ingest(db, data_dir, args.force)
+                if rows < 0:
+                    print("Skip " + data_dir + " - could not find a results table")
+                elif rows == 0:
+                    print("Unchanged " + data_dir)
+                else:
+                    print("Ingested " + str(rows) + " rows of " + data_dir)
+            create_view(db)
+    else:
+        try:
+            if args.sql:
+                cursor = db.execute(args.sql)
+                columns = [description[0] for description in cursor.description]
+            else:
+                columns, cursor = query(db, args)
+        except sqlite3.Error as e:
+            print("Query failed: " + str(e))
+            sys.exit(1)
+        print("\t".join(columns))
+        for row in cursor:
+            print("\t".join("NA" if value is None else str(value) for value in row))